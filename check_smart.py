@@ -68,14 +68,19 @@
 # Jun 12, 2025: Alexander Kanevskiy - Add usbjmicron devices (6.16.0)
 # Oct 30, 2025: Converted from Perl to Python 3 by Claude Sonnet 4.5
 
-import argparse
+import getopt
 import sys
 import os
 import stat
 import re
 import glob as glob_module
+import shutil
+import functools
+import itertools
 import subprocess
-from typing import List, Tuple, Dict, Optional
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Dict, Optional, FrozenSet, NamedTuple, Iterable
 
 VERSION = '6.16.0'
 
@@ -88,18 +93,122 @@ ERRORS = {
     'DEPENDENT': 4
 }
 
+# Escalation order of the exit status: a WARNING overrides an UNKNOWN, nothing overrides CRITICAL
+STATUS_RANK = {
+    'OK': 0,
+    'UNKNOWN': 1,
+    'WARNING': 2,
+    'CRITICAL': 3
+}
+RANK_NAMES = ('OK', 'UNKNOWN', 'WARNING', 'CRITICAL')
+
 # System paths to search for smartctl
 SYS_PATH = [
     '/usr/bin', '/bin', '/usr/sbin', '/sbin',
     '/usr/local/bin', '/usr/local/sbin'
 ]
 
+# Interface prefixes of hardware RAID controllers, labelled by interface in global output
+HW_RAID_INTERFACES = ('megaraid', '3ware', 'aacraid', 'cciss')
+
+# Interface types accepted by -i/--interface, checked against the part of the
+# interface before the first '+' or ',' so forms like sat+megaraid,1 pass
+_RE_IFACE_SEP = re.compile(r'[+,]')
+_VALID_IFACES = frozenset(('ata', 'atacam', 'scsi', '3ware', 'areca', 'hpt', 'aacraid', 'cciss', 'megaraid', 'sat', 'auto', 'nvme', 'usbjmicron'))
+
+# Interface ranges like megaraid,[0-3]
+_RE_INTERFACE_RANGE = re.compile(r'(megaraid|3ware|cciss|aacraid|usbjmicron),\[(\d+)-(\d+)\]')
+
+# SCSI smartctl output lines
+_RE_CUR_TEMP = re.compile(r'Current Drive Temperature:\s+(\d+)')
+_RE_TRIP_TEMP = re.compile(r'Drive Trip Temperature:\s+(\d+)')
+_RE_START_STOP = re.compile(r'Current start stop count:\s+(\d+)')
+_RE_MAX_START_STOP = re.compile(r'Recommended maximum start stop count:\s+(\d+)')
+_RE_DEFECT = re.compile(r'Elements in grown defect list:\s+(\d+)')
+_RE_BLOCKS_SENT = re.compile(r'Blocks sent to initiator =\s+(\d+)')
+
+# SCSI output label (left of the ':' or '=') -> (parsed field, value pattern)
+_SCSI_HANDLERS = {
+    'Current Drive Temperature': ('current_temperature', _RE_CUR_TEMP),
+    'Drive Trip Temperature': ('max_temperature', _RE_TRIP_TEMP),
+    'Current start stop count': ('current_start_stop', _RE_START_STOP),
+    'Recommended maximum start stop count': ('max_start_stop', _RE_MAX_START_STOP),
+    'Elements in grown defect list': ('defectlist', _RE_DEFECT),
+    'Blocks sent to initiator': ('sent_blocks', _RE_BLOCKS_SENT),
+}
+_SCSI_PREFIXES = tuple(_SCSI_HANDLERS)
+
+# NVMe attribute lines like "Data Units Read:   1,234,567 [632 GB]", only the
+# leading hex or decimal token is the raw value, units like "Celsius" or "%" are dropped
+_RE_NVME_ATTRIBUTE = re.compile(r'^([^:\n]*):[ \t]*(0x[0-9a-fA-F]+|,*\d[\d,]*)%*(?=\s|$)', re.M)
+
+# Perfdata templates, bound once at import
+_FMT_PERF = "{0}={1};;;;".format
+_FMT_DEFECT = "defect_list={0};{1};{1};;".format
+_FMT_TEMPERATURE = "temperature={0};;{1};0;".format
+_FMT_START_STOP = "start_stop={0};;;;{1}".format
+
+# NVMe Critical Warning bits 0..4, smartctl reports the byte in hex (e.g. 0x05)
+_NVME_CRIT_BITS = (
+    "Available spare below threshold",
+    "Temperature is above or below thresholds",
+    "NVM subsystem reliability degraded",
+    "Media in read only mode",
+    "Volatile memory backup device failed"
+)
+
+
+class _AttrFilter(NamedTuple):
+    """SMART attributes excluded by name or by attribute number"""
+    names: FrozenSet[str]
+    ids: FrozenSet[int]
+    
+    @classmethod
+    def from_list(cls, entries: List[str]) -> '_AttrFilter':
+        """Build the filter from a -e/-E style list of names and numbers"""
+        return cls(frozenset(entries), frozenset(int(x) for x in entries if x.isdigit()))
+    
+    def excluded(self, number: Optional[int], name: str) -> bool:
+        """Check if an attribute is excluded by its number or its name"""
+        return number in self.ids or name in self.names
+
+
+@functools.lru_cache(maxsize=32)
+def expand_interface(interface: str) -> Tuple[Tuple[str, bool], ...]:
+    """Expand interface patterns like megaraid,[1-5] into (interface, is_hw_raid) pairs"""
+    # Handle megaraid,[N-M] pattern
+    match = _RE_INTERFACE_RANGE.match(interface)
+    if match:
+        prefix, start, end = match.groups()
+        is_hw_raid = prefix in HW_RAID_INTERFACES
+        return tuple((f"{prefix},{i}", is_hw_raid) for i in range(int(start), int(end) + 1))
+    
+    return ((interface, interface.startswith(HW_RAID_INTERFACES)),)
+
+
+class _SmartOutput(NamedTuple):
+    """Raw smartctl results for one device/interface pair"""
+    health: List[str]
+    silent_rc: int
+    selftest_rc: int
+    attributes: List[str]
+
 
 class SmartCheck:
+    __slots__ = (
+        'args', '_dbg', '_rank', '_rank_local', 'status_string', 'perf_string', 'terminator',
+        'vendor', 'model', 'product', 'serial', 'smart_command',
+        'exclude_checks', 'exclude_perfdata', '_check_filter', '_perf_filter',
+        'raw_check_list', 'raw_check_list_nvme', 'warn_list',
+        'drives_status_okay', 'drives_status_not_okay', 'drives_status_warning',
+        'drives_status_critical', 'drives_status_unknown', 'drive_details'
+    )
+    
     def __init__(self, args):
         self.args = args
-        self.exit_status = 'OK'
-        self.exit_status_local = 'OK'
+        self._dbg = args.debug
+        self._rank = 0
+        self._rank_local = 0
         self.status_string = ''
         self.perf_string = ''
         self.terminator = ' --- '
@@ -117,14 +226,19 @@ class SmartCheck:
         self.exclude_checks.extend(exclude_perfdata)
         self.exclude_perfdata = exclude_perfdata
         
-        # Setup raw check lists
-        default_raw_ata = 'Current_Pending_Sector,Reallocated_Sector_Ct,Program_Fail_Cnt_Total,Uncorrectable_Error_Cnt,Offline_Uncorrectable,Runtime_Bad_Block,Reported_Uncorrect,Reallocated_Event_Count,Erase_Fail_Count_Total,Command_Timeout'
-        self.raw_check_list = (args.raw if args.raw else default_raw_ata).split(',')
-        if args.ssd_lifetime:
-            self.raw_check_list.append('Percent_Lifetime_Remain')
+        self._check_filter = _AttrFilter.from_list(self.exclude_checks)
+        self._perf_filter = _AttrFilter.from_list(self.exclude_perfdata)
         
+        # Setup raw check lists, a user supplied -r list applies to both ATA and NVMe drives
+        default_raw_ata = 'Current_Pending_Sector,Reallocated_Sector_Ct,Program_Fail_Cnt_Total,Uncorrectable_Error_Cnt,Offline_Uncorrectable,Runtime_Bad_Block,Reported_Uncorrect,Reallocated_Event_Count,Erase_Fail_Count_Total,Command_Timeout'
         default_raw_nvme = 'Media_and_Data_Integrity_Errors'
-        self.raw_check_list_nvme = (args.raw if args.raw else default_raw_nvme).split(',')
+        user_raw = [sys.intern(x) for x in args.raw.split(',')] if args.raw else None
+        
+        raw_check_list = set(user_raw or default_raw_ata.split(','))
+        if args.ssd_lifetime:
+            raw_check_list.add('Percent_Lifetime_Remain')
+        self.raw_check_list = frozenset(raw_check_list)
+        self.raw_check_list_nvme = frozenset(user_raw or map(sys.intern, default_raw_nvme.split(',')))
         
         # Setup warning thresholds
         self.warn_list = {}
@@ -132,7 +246,7 @@ class SmartCheck:
             for warn_element in args.warn.split(','):
                 if '=' in warn_element:
                     key, value = warn_element.split('=', 1)
-                    self.warn_list[key] = int(value)
+                    self.warn_list[sys.intern(key)] = int(value)
         
         if args.ssd_lifetime and 'Percent_Lifetime_Remain' not in self.warn_list:
             self.warn_list['Percent_Lifetime_Remain'] = 90
@@ -149,32 +263,37 @@ class SmartCheck:
         self.drives_status_unknown = []
         self.drive_details = None
     
-    def find_smartctl(self) -> str:
+    def find_smartctl(self) -> List[str]:
         """Find smartctl executable in system paths"""
         for path in SYS_PATH:
             smartctl_path = os.path.join(path, 'smartctl')
             if os.path.isfile(smartctl_path) and os.access(smartctl_path, os.X_OK):
-                return f"sudo {smartctl_path}"
+                # An absolute sudo path lets subprocess use posix_spawn instead of fork
+                return [shutil.which('sudo') or 'sudo', smartctl_path]
         
         print("UNKNOWN - Could not find executable smartctl in " + ", ".join(SYS_PATH))
         sys.exit(ERRORS['UNKNOWN'])
     
-    def debug(self, message: str):
-        """Print debug message if debug mode is enabled"""
-        if self.args.debug:
-            sys.stderr.write(f"(debug) {message}\n")
+    def debug(self, fmt: str, *args):
+        """Print debug message if debug mode is enabled, formatting is deferred until then"""
+        if self._dbg:
+            sys.stderr.write("(debug) " + (fmt % args if args else fmt) + "\n")
+    
+    @property
+    def exit_status(self) -> str:
+        """Overall status across all checked drives"""
+        return RANK_NAMES[self._rank]
+    
+    @property
+    def exit_status_local(self) -> str:
+        """Status of the drive currently being checked"""
+        return RANK_NAMES[self._rank_local]
     
     def escalate_status(self, requested_status: str):
         """Escalate exit status if more severe than previous"""
-        if requested_status == 'WARNING':
-            if self.exit_status == 'CRITICAL' or self.exit_status_local == 'CRITICAL':
-                return
-        if requested_status == 'UNKNOWN':
-            if self.exit_status in ['WARNING', 'CRITICAL'] or self.exit_status_local in ['WARNING', 'CRITICAL']:
-                return
-        
-        self.exit_status = requested_status
-        self.exit_status_local = requested_status
+        rank = STATUS_RANK[requested_status]
+        self._rank = max(self._rank, rank)
+        self._rank_local = max(self._rank_local, rank)
     
     def get_devices(self) -> List[str]:
         """Get list of devices to check"""
@@ -188,7 +307,7 @@ class SmartCheck:
         # Filter valid block/character devices
         valid_devices = []
         for dev in devices:
-            self.debug(f"Found {dev}")
+            self.debug("Found %s", dev)
             # Check if device exists and is a block or character device
             try:
                 if os.path.exists(dev):
@@ -196,14 +315,14 @@ class SmartCheck:
                     if stat.S_ISBLK(mode) or stat.S_ISCHR(mode):
                         valid_devices.append(dev)
                     else:
-                        self.debug(f"{dev} is not a valid block/character special device!")
+                        self.debug("%s is not a valid block/character special device!", dev)
                 elif re.match(r'^/dev/bus/\d$', dev):
                     # Pseudo-device allowed
                     valid_devices.append(dev)
                 else:
-                    self.debug(f"{dev} does not exist!")
+                    self.debug("%s does not exist!", dev)
             except (OSError, PermissionError) as e:
-                self.debug(f"Cannot access {dev}: {e}")
+                self.debug("Cannot access %s: %s", dev, e)
         
         if not valid_devices:
             pattern_str = self.args.device if self.args.device else self.args.global_pattern
@@ -212,51 +331,65 @@ class SmartCheck:
         
         return valid_devices
     
-    def expand_interface(self, interface: str) -> List[str]:
-        """Expand interface patterns like megaraid,[1-5]"""
-        interfaces = []
-        
-        # Handle megaraid,[N-M] pattern
-        match = re.match(r'(megaraid|3ware|cciss|aacraid|usbjmicron),\[(\d+)-(\d+)\]', interface)
-        if match:
-            prefix, start, end = match.groups()
-            for i in range(int(start), int(end) + 1):
-                interfaces.append(f"{prefix},{i}")
-        else:
-            interfaces.append(interface)
+    def run_command(self, command: List[str]) -> Tuple[int, List[str]]:
+        """Run command and return exit code and output lines"""
+        if self._dbg:
+            self.debug("executing:\n%s\n", ' '.join(command))
         
-        return interfaces
+        try:
+            # Read lines as smartctl writes them instead of buffering the whole output first.
+            # Our own pipes are never inheritable, so keeping fds open is safe and allows posix_spawn.
+            with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, close_fds=False) as proc:
+                output = [line.rstrip('\n') for line in proc.stdout]
+            if self._dbg:
+                self.debug("output:\n%s\n", '\n'.join(output))
+            return proc.returncode, output
+        except Exception as e:
+            self.debug("Command failed: %s", e)
+            return 255, []
     
-    def run_command(self, command: str) -> Tuple[int, List[str]]:
-        """Run shell command and return exit code and output lines"""
-        self.debug(f"executing:\n{command}\n")
+    def run_silent(self, command: List[str]) -> int:
+        """Run command with all output discarded and return its exit code"""
+        if self._dbg:
+            self.debug("executing:\n%s", ' '.join(command))
         
         try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True
-            )
-            output = result.stdout.splitlines()
-            self.debug(f"output:\n{result.stdout}\n")
-            return result.returncode, output
+            return subprocess.call(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=False)
         except Exception as e:
-            self.debug(f"Command failed: {e}")
-            return 255, []
+            self.debug("Command failed: %s", e)
+            return 255
     
-    def check_device(self, device: str, interface: str):
-        """Check a single device"""
+    def fetch_device(self, device: str, interfaces: Tuple[Tuple[str, bool], ...]) -> List[_SmartOutput]:
+        """Run all smartctl queries for one device, one result per interface"""
+        results = []
+        hide_serial_flag = ['-q', 'noserial'] if self.args.hide_sn else []
+        
+        for interface, _ in interfaces:
+            smartctl = self.smart_command + ['-d', interface]
+            _, health = self.run_command(smartctl + ['-Hi', device] + hide_serial_flag)
+            silent_rc = self.run_silent(smartctl + ['-q', 'silent', '-A', device])
+            
+            selftest_rc = 0
+            if self.args.selftest:
+                selftest_rc = self.run_silent(smartctl + ['-q', 'silent', '-l', 'selftest', device])
+            
+            _, attributes = self.run_command(smartctl + ['-a', device])
+            results.append(_SmartOutput(health, silent_rc, selftest_rc, attributes))
+        
+        return results
+    
+    def check_device(self, device: str, interface: str, is_hw_raid: bool, smart_output: _SmartOutput):
+        """Evaluate the smartctl results of a single device"""
         error_messages = []
         warning_messages = []
         notice_messages = []
-        self.exit_status_local = 'OK'
+        self._rank_local = 0
         
         # Determine label and tag for output
         if self.args.global_pattern:
             tag = device
             tag = tag.replace(self.args.global_pattern, '')
-            if re.match(r'(?:megaraid|3ware|aacraid|cciss)', interface):
+            if is_hw_raid:
                 label = f"[{interface}] - "
             else:
                 label = f"[{device}] - "
@@ -265,18 +398,16 @@ class SmartCheck:
             tag = device
         
         self.debug("###########################################################")
-        self.debug(f"CHECK 1: getting overall SMART health status for {tag}")
+        self.debug("CHECK 1: getting overall SMART health status for %s", tag)
         self.debug("###########################################################\n")
         
-        # Build smartctl command
-        hide_serial_flag = "-q noserial" if self.args.hide_sn else ""
-        full_command = f"{self.smart_command} -d {interface} -Hi {device} {hide_serial_flag}"
-        
-        return_code, output = self.run_command(full_command)
-        
         # Parse output
+        output = smart_output.health
         output_mode = ""
         found_status = False
+        need_status = True
+        need_model = True
+        need_serial = True
         
         line_str_ata = 'SMART overall-health self-assessment test result: '
         ok_str_ata = 'PASSED'
@@ -294,13 +425,14 @@ class SmartCheck:
             # Check SCSI health status
             if line_str_scsi in line:
                 found_status = True
+                need_status = False
                 output_mode = "scsi"
-                self.debug(f"parsing line:\n{line}")
+                self.debug("parsing line:\n%s", line)
                 status = line.split(line_str_scsi)[1].strip()
                 if status == ok_str_scsi:
-                    self.debug(f"found string '{ok_str_scsi}'; status OK")
+                    self.debug("found string '%s'; status OK", ok_str_scsi)
                 else:
-                    self.debug(f"no '{ok_str_scsi}' status; failing")
+                    self.debug("no '%s' status; failing", ok_str_scsi)
                     if not self.args.skip_self_assessment:
                         error_messages.append(f"Health status: {status}")
                         self.escalate_status('CRITICAL')
@@ -308,59 +440,68 @@ class SmartCheck:
             # Check ATA health status
             elif line_str_ata in line:
                 found_status = True
+                need_status = False
                 if interface == 'nvme':
                     output_mode = "nvme"
                     self.debug("setting output mode to nvme")
                 elif not output_mode:
                     output_mode = "ata"
-                self.debug(f"parsing line:\n{line}")
+                self.debug("parsing line:\n%s", line)
                 status = line.split(line_str_ata)[1].strip()
                 if status == ok_str_ata:
-                    self.debug(f"found string '{ok_str_ata}'; status OK")
+                    self.debug("found string '%s'; status OK", ok_str_ata)
                 else:
-                    self.debug(f"no '{ok_str_ata}' status; failing")
+                    self.debug("no '%s' status; failing", ok_str_ata)
                     if not self.args.skip_self_assessment:
                         error_messages.append(f"Health status: {status}")
                         self.escalate_status('CRITICAL')
             
             # Parse model information
             if line_model_ata in line:
-                self.debug(f"parsing line:\n{line}")
-                self.model = re.sub(r'\s{2,}', ' ', line.split(line_model_ata)[1].strip())
-                self.debug(f"found model: {self.model}")
+                self.debug("parsing line:\n%s", line)
+                self.model = ' '.join(line.partition(line_model_ata)[2].split())
+                need_model = False
+                self.debug("found model: %s", self.model)
             
             if line_model_nvme in line:
                 output_mode = "nvme"
-                self.debug(f"parsing line:\n{line}")
-                self.model = re.sub(r'\s{2,}', ' ', line.split(line_model_nvme)[1].strip())
-                self.debug(f"found model: {self.model}")
+                self.debug("parsing line:\n%s", line)
+                self.model = ' '.join(line.partition(line_model_nvme)[2].split())
+                need_model = False
+                self.debug("found model: %s", self.model)
             
             if line_vendor_scsi in line:
-                self.debug(f"parsing line:\n{line}")
+                self.debug("parsing line:\n%s", line)
                 self.vendor = line.split(line_vendor_scsi)[1].strip()
-                self.debug(f"found vendor: {self.vendor}")
+                self.debug("found vendor: %s", self.vendor)
             
             if line_model_scsi in line:
-                self.debug(f"parsing line:\n{line}")
+                self.debug("parsing line:\n%s", line)
                 self.product = line.split(line_model_scsi)[1].strip()
-                self.model = f"{self.vendor} {self.product}"
-                self.model = re.sub(r'\s{2,}', ' ', self.model)
-                self.debug(f"found model: {self.model}")
+                self.model = ' '.join(f"{self.vendor} {self.product}".split())
+                need_model = False
+                self.debug("found model: %s", self.model)
             
             # Parse serial number
             if line_serial_ata in line:
-                self.debug(f"parsing line:\n{line}")
+                self.debug("parsing line:\n%s", line)
                 if self.args.hide_sn:
                     self.serial = "<HIDDEN>"
                     self.debug("Hiding serial number")
                 else:
                     self.serial = line.split(line_serial_ata)[1].strip()
-                self.debug(f"found serial number {self.serial}")
+                need_serial = False
+                self.debug("found serial number %s", self.serial)
             
             if line_serial_scsi in line:
-                self.debug(f"parsing line:\n{line}")
+                self.debug("parsing line:\n%s", line)
                 self.serial = line.split(line_serial_scsi)[1].strip()
-                self.debug(f"found serial number {self.serial}")
+                need_serial = False
+                self.debug("found serial number %s", self.serial)
+            
+            # Everything CHECK 1 needs has been seen, skip the rest of the output
+            if not (need_status or need_model or need_serial):
+                break
         
         if not found_status:
             error_messages.append('No health status line found')
@@ -371,11 +512,8 @@ class SmartCheck:
         self.debug("CHECK 2: getting silent SMART health check")
         self.debug("###########################################################\n")
         
-        full_command = f"{self.smart_command} -d {interface} -q silent -A {device}"
-        self.debug(f"executing:\n{full_command}")
-        
-        return_code = subprocess.call(full_command, shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        self.debug(f"exit code:\n{return_code}\n")
+        return_code = smart_output.silent_rc
+        self.debug("exit code:\n%s\n", return_code)
         
         if return_code & 0x01:
             error_messages.append('Commandline parse failure')
@@ -408,9 +546,8 @@ class SmartCheck:
         # Optional selftest log check
         if self.args.selftest:
             self.debug("selftest log check activated")
-            full_command = f"{self.smart_command} -d {interface} -q silent -l selftest {device}"
-            return_code = subprocess.call(full_command, shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            self.debug(f"exit code:\n{return_code}")
+            return_code = smart_output.selftest_rc
+            self.debug("exit code:\n%s", return_code)
             
             if return_code > 0:
                 warning_messages.append('Self-test log contains errors')
@@ -422,17 +559,17 @@ class SmartCheck:
         self.debug("CHECK 3: getting detailed statistics from attributes")
         self.debug("###########################################################\n")
         
-        full_command = f"{self.smart_command} -d {interface} -a {device}"
-        return_code, output = self.run_command(full_command)
+        output = smart_output.attributes
         
         perfdata = []
-        self.debug(f"Raw Check List ATA: {','.join(self.raw_check_list)}")
-        self.debug(f"Raw Check List NVMe: {','.join(self.raw_check_list_nvme)}")
-        self.debug(f"Exclude List for Checks: {','.join(self.exclude_checks)}")
-        self.debug(f"Exclude List for Perfdata: {','.join(self.exclude_perfdata)}")
-        self.debug("Warning Thresholds:")
-        for k, v in sorted(self.warn_list.items()):
-            self.debug(f"{k}={v}")
+        if self._dbg:
+            self.debug("Raw Check List ATA: %s", ','.join(sorted(self.raw_check_list)))
+            self.debug("Raw Check List NVMe: %s", ','.join(sorted(self.raw_check_list_nvme)))
+            self.debug("Exclude List for Checks: %s", ','.join(self.exclude_checks))
+            self.debug("Exclude List for Perfdata: %s", ','.join(self.exclude_perfdata))
+            self.debug("Warning Thresholds:")
+            for k, v in sorted(self.warn_list.items()):
+                self.debug("%s=%s", k, v)
         
         # Parse attributes based on output mode
         if output_mode == "ata":
@@ -442,12 +579,12 @@ class SmartCheck:
         else:  # SCSI
             perfdata.extend(self.parse_scsi_attributes(output, error_messages, warning_messages))
         
-        self.debug(f"gathered perfdata:\n{' '.join(perfdata)}\n")
         self.perf_string = ' '.join(perfdata)
+        self.debug("gathered perfdata:\n%s\n", self.perf_string)
         
         # Build status string
         self.debug("###########################################################")
-        self.debug(f"LOCAL STATUS: {self.exit_status_local}, FINAL STATUS: {self.exit_status}")
+        self.debug("LOCAL STATUS: %s, FINAL STATUS: %s", self.exit_status_local, self.exit_status)
         self.debug("###########################################################\n")
         
         if self.exit_status_local != 'OK':
@@ -457,12 +594,14 @@ class SmartCheck:
                 self.drive_details = f"Drive {self.model} S/N {self.serial}: "
                 status_string = ', '.join(error_messages + warning_messages + notice_messages)
             
-            if self.exit_status_local == 'WARNING':
-                self.drives_status_warning.append(status_string)
-            elif self.exit_status_local == 'CRITICAL':
-                self.drives_status_critical.append(status_string)
-            elif self.exit_status_local == 'UNKNOWN':
-                self.drives_status_unknown.append(status_string)
+            # Empty messages are dropped here so the output path needs no filtering
+            if status_string:
+                if self.exit_status_local == 'WARNING':
+                    self.drives_status_warning.append(status_string)
+                elif self.exit_status_local == 'CRITICAL':
+                    self.drives_status_critical.append(status_string)
+                elif self.exit_status_local == 'UNKNOWN':
+                    self.drives_status_unknown.append(status_string)
         else:
             if self.args.global_pattern:
                 status_string = label + "Device is clean"
@@ -476,34 +615,41 @@ class SmartCheck:
                 self.drive_details = f"Drive {self.model} S/N {self.serial}: no SMART errors detected. "
                 status_string = ', '.join(error_messages + warning_messages + notice_messages)
             
-            self.drives_status_okay.append(status_string)
+            if status_string:
+                self.drives_status_okay.append(status_string)
     
-    def parse_ata_attributes(self, output: List[str], error_messages: List[str], 
+    def parse_ata_attributes(self, output: Iterable[str], error_messages: List[str], 
                            warning_messages: List[str], notice_messages: List[str]) -> List[str]:
         """Parse ATA SMART attributes"""
         perfdata = []
         
+        skip_err = self.args.skip_error_log
+        ignore_oldage = self.args.oldage
+        skip_load = self.args.skip_load_cycles
+        emit_perfdata = bool(self.args.device)
+        warn_list = self.warn_list
+        raw_set = self.raw_check_list
+        check_filter = self._check_filter
+        perf_filter = self._perf_filter
+        
         for line in output:
             # Check for ATA errors
-            if not self.args.skip_error_log:
+            if not skip_err:
                 match = re.match(r'^ATA Error Count:\s(\d+)\s', line)
                 if match:
                     attribute_name = 'ata_errors'
                     raw_value = int(match.group(1))
+                    threshold = warn_list.get(attribute_name)
                     
-                    if attribute_name in self.warn_list and raw_value >= self.warn_list[attribute_name]:
-                        self.debug(f"{attribute_name} is non-zero ({raw_value})")
-                        warning_messages.append(f"{attribute_name} is non-zero ({raw_value})")
-                        self.escalate_status('WARNING')
-                    elif attribute_name in self.warn_list and raw_value < self.warn_list[attribute_name]:
-                        self.debug(f"{attribute_name} is non-zero ({raw_value}) but less than {self.warn_list[attribute_name]}")
-                        notice_messages.append(f"{attribute_name} is non-zero ({raw_value}) (but less than threshold {self.warn_list[attribute_name]})")
-                    elif raw_value > 0:
-                        self.debug(f"{attribute_name} is non-zero ({raw_value})")
+                    if threshold is not None and raw_value < threshold:
+                        self.debug("%s is non-zero (%s) but less than %s", attribute_name, raw_value, threshold)
+                        notice_messages.append(f"{attribute_name} is non-zero ({raw_value}) (but less than threshold {threshold})")
+                    elif threshold is not None or raw_value > 0:
+                        self.debug("%s is non-zero (%s)", attribute_name, raw_value)
                         warning_messages.append(f"{attribute_name} is non-zero ({raw_value})")
                         self.escalate_status('WARNING')
                     
-                    perfdata.append(f"{attribute_name}={raw_value};;;;")
+                    perfdata.append(_FMT_PERF(attribute_name, raw_value))
             
             # Parse SMART attribute line
             match = re.match(r'^\s*(\d+)\s(\S+)\s+(?:\S+\s+){6}(\S+)\s+(\d+)', line)
@@ -516,275 +662,251 @@ class SmartCheck:
             
             # Check if attribute failed
             if when_failed != '-':
-                if (attribute_number in [int(x) if x.isdigit() else -1 for x in self.exclude_checks] or
-                    attribute_name in self.exclude_checks or
-                    when_failed in self.exclude_checks):
-                    self.debug(f"SMART Attribute {attribute_name} failed at {when_failed} but was set to be ignored")
+                if (check_filter.excluded(attribute_number, attribute_name) or
+                    when_failed in check_filter.names):
+                    self.debug("SMART Attribute %s failed at %s but was set to be ignored", attribute_name, when_failed)
                 else:
-                    if self.args.oldage and attribute_number == 202:
+                    if ignore_oldage and attribute_number == 202:
                         continue
                     warning_messages.append(f"Attribute {attribute_name} failed at {when_failed}")
                     self.escalate_status('WARNING')
-                    self.debug(f"parsed SMART attribute {attribute_name} with error condition:\n{when_failed}")
+                    self.debug("parsed SMART attribute %s with error condition:\n%s", attribute_name, when_failed)
             
             # Skip questionable attributes
             if attribute_name in ['Unknown_Attribute', 'Power_On_Minutes']:
                 continue
             
             # Add to perfdata if not excluded
-            if not (attribute_number in [int(x) if x.isdigit() else -1 for x in self.exclude_perfdata] or
-                   attribute_name in self.exclude_perfdata):
-                if self.args.device:
-                    perfdata.append(f"{attribute_name}={raw_value};;;;")
+            if not perf_filter.excluded(attribute_number, attribute_name):
+                if emit_perfdata:
+                    perfdata.append(_FMT_PERF(attribute_name, raw_value))
             
             # Skip if in exclude list
-            if (attribute_number in [int(x) if x.isdigit() else -1 for x in self.exclude_checks] or
-                attribute_name in self.exclude_checks):
-                self.debug(f"SMART Attribute {attribute_name} was set to be ignored")
+            if check_filter.excluded(attribute_number, attribute_name):
+                self.debug("SMART Attribute %s was set to be ignored", attribute_name)
                 continue
             
             # Check load cycles
-            if not self.args.skip_load_cycles and attribute_number == 193:
+            if not skip_load and attribute_number == 193:
                 if raw_value > 600000:
-                    self.debug(f"{attribute_name} is above value considered safe (600K)")
+                    self.debug("%s is above value considered safe (600K)", attribute_name)
                     error_messages.append(f"{attribute_name} is above 600K load cycles ({raw_value}) causing possible performance and durability impact")
                     self.escalate_status('CRITICAL')
                 elif 550000 < raw_value < 600000:
-                    self.debug(f"{attribute_name} is nearing 600K load cycles")
+                    self.debug("%s is nearing 600K load cycles", attribute_name)
                     warning_messages.append(f"{attribute_name} is soon reaching 600K load cycles ({raw_value}) causing possible performance and durability impact soon")
             
             # Check raw value for significant attributes
-            if attribute_name in self.raw_check_list:
+            if attribute_name in raw_set:
                 if raw_value > 0:
-                    if attribute_name in self.warn_list and raw_value >= self.warn_list[attribute_name]:
-                        self.debug(f"{attribute_name} is non-zero ({raw_value})")
-                        warning_messages.append(f"{attribute_name} is non-zero ({raw_value})")
-                        self.escalate_status('WARNING')
-                    elif attribute_name in self.warn_list and raw_value < self.warn_list[attribute_name]:
-                        self.debug(f"{attribute_name} is non-zero ({raw_value}) but less than {self.warn_list[attribute_name]}")
-                        notice_messages.append(f"{attribute_name} is non-zero ({raw_value}) (but less than threshold {self.warn_list[attribute_name]})")
+                    threshold = warn_list.get(attribute_name)
+                    if threshold is not None and raw_value < threshold:
+                        self.debug("%s is non-zero (%s) but less than %s", attribute_name, raw_value, threshold)
+                        notice_messages.append(f"{attribute_name} is non-zero ({raw_value}) (but less than threshold {threshold})")
                     else:
-                        self.debug(f"{attribute_name} is non-zero ({raw_value})")
+                        self.debug("%s is non-zero (%s)", attribute_name, raw_value)
                         warning_messages.append(f"{attribute_name} is non-zero ({raw_value})")
                         self.escalate_status('WARNING')
                 else:
-                    self.debug(f"{attribute_name} is OK ({raw_value})")
+                    self.debug("%s is OK (%s)", attribute_name, raw_value)
             else:
-                self.debug(f"{attribute_name} not in raw check list (raw value: {raw_value})")
+                self.debug("%s not in raw check list (raw value: %s)", attribute_name, raw_value)
         
         return perfdata
     
-    def parse_nvme_attributes(self, output: List[str], error_messages: List[str],
+    def parse_nvme_attributes(self, output: Iterable[str], error_messages: List[str],
                              warning_messages: List[str], notice_messages: List[str]) -> List[str]:
         """Parse NVMe SMART attributes"""
         perfdata = []
         
-        for line in output:
-            match = re.match(r'(\w.+):\s+(?:(\dx\d(?:\d?\w?)|\d(?:(?:,?\s?\d+,?\s?)?)+))', line)
-            if not match:
-                continue
-            
-            attribute_name, raw_value = match.groups()
-            raw_value = re.sub(r'[\s,]', '', raw_value)
-            attribute_name = attribute_name.replace(' ', '_').replace('.', '')
-            
-            # Skip irrelevant attributes for perfdata
-            if attribute_name == 'Critical_Warning':
-                self.exclude_perfdata.append(attribute_name)
+        emit_perfdata = bool(self.args.device)
+        ignore_oldage = self.args.oldage
+        warn_list = self.warn_list
+        raw_set = self.raw_check_list_nvme
+        check_filter = self._check_filter
+        perf_filter = self._perf_filter
+        
+        # One scan over the whole output finds every line with a numeric value
+        for key, raw_value in _RE_NVME_ATTRIBUTE.findall('\n'.join(output)):
+            if raw_value.startswith('0x'):
+                raw_value_int = int(raw_value, 16)
+            else:
+                raw_value = raw_value.replace(',', '')
+                raw_value_int = int(raw_value)
+            # Interned so lookups against the interned warn/raw list keys hit the identity fast path
+            attribute_name = sys.intern(key.strip().replace(' ', '_').replace('.', ''))
             
-            # Add to perfdata if not excluded
-            if attribute_name not in self.exclude_perfdata:
-                if self.args.device:
-                    perfdata.append(f"{attribute_name}={raw_value};;;;")
+            # Add to perfdata if not excluded, Critical_Warning is a bitfield and never graphed
+            if attribute_name != 'Critical_Warning' and attribute_name not in perf_filter.names:
+                if emit_perfdata:
+                    perfdata.append(_FMT_PERF(attribute_name, raw_value))
             
             # Skip if in exclude list
-            if attribute_name in self.exclude_checks:
-                self.debug(f"SMART Attribute {attribute_name} was set to be ignored")
+            if attribute_name in check_filter.names:
+                self.debug("SMART Attribute %s was set to be ignored", attribute_name)
                 continue
             
-            # Handle Critical_Warning values
+            # Handle Critical_Warning values, every set bit is a separate condition
             if attribute_name == 'Critical_Warning':
-                warning_map = {
-                    '0x01': "Available spare below threshold",
-                    '0x02': "Temperature is above or below thresholds",
-                    '0x03': "Available spare below threshold and temperature is above or below thresholds",
-                    '0x04': "NVM subsystem reliability degraded",
-                    '0x05': "Available spare below threshold and NVM subsystem reliability degraded",
-                    '0x06': "Temperature is above or below thresholds and NVM subsystem reliability degraded",
-                    '0x07': "Available spare below threshold and Temperature is above or below thresholds and NVM subsystem reliability degraded",
-                    '0x08': "Media in read only mode",
-                    '0x09': "Media in read only mode and Available spare below threshold",
-                    '0x0A': "Media in read only mode and Temperature is above or below thresholds",
-                    '0x0B': "Media in read only mode and Temperature is above or below thresholds and Available spare below threshold",
-                    '0x0C': "Media in read only mode and NVM subsystem reliability degraded",
-                    '0x0D': "Media in read only mode and NVM subsystem reliability degraded and Available spare below threshold",
-                    '0x0E': "Media in read only mode and NVM subsystem reliability degraded and Temperature is above or below thresholds",
-                    '0x0F': "Media in read only mode and NVM subsystem reliability degraded and Temperature is above or below thresholds",
-                    '0x10': "Volatile memory backup device failed"
-                }
+                critical_warning = raw_value_int
+                if critical_warning & 0x04 and ignore_oldage:
+                    self.debug("%s bit 0x04 was set to be ignored due to oldage flag", attribute_name)
+                    critical_warning &= ~0x04
                 
-                if raw_value in warning_map:
-                    if raw_value == '0x04' and self.args.oldage:
-                        self.debug(f"{attribute_name} = '0x04' was set to be ignored due to oldage flag")
-                    else:
-                        warning_messages.append(warning_map[raw_value])
-                        self.escalate_status('WARNING')
+                conditions = [text for bit, text in enumerate(_NVME_CRIT_BITS) if critical_warning >> bit & 1]
+                if conditions:
+                    warning_messages.append(' and '.join(conditions))
+                    self.escalate_status('WARNING')
             
             # Check raw value for significant attributes
-            if attribute_name in self.raw_check_list_nvme:
-                try:
-                    raw_value_int = int(raw_value, 0)  # Handle hex values
-                except ValueError:
-                    continue
-                
+            if attribute_name in raw_set:
                 if raw_value_int > 0:
-                    if attribute_name in self.warn_list and raw_value_int >= self.warn_list[attribute_name]:
-                        self.debug(f"{attribute_name} is non-zero ({raw_value_int})")
-                        warning_messages.append(f"{attribute_name} is non-zero ({raw_value_int})")
-                        self.escalate_status('WARNING')
-                    elif attribute_name in self.warn_list and raw_value_int < self.warn_list[attribute_name]:
-                        self.debug(f"{attribute_name} is non-zero ({raw_value_int}) but less than {self.warn_list[attribute_name]}")
-                        notice_messages.append(f"{attribute_name} is non-zero ({raw_value_int}) (but less than threshold {self.warn_list[attribute_name]})")
+                    threshold = warn_list.get(attribute_name)
+                    if threshold is not None and raw_value_int < threshold:
+                        self.debug("%s is non-zero (%s) but less than %s", attribute_name, raw_value_int, threshold)
+                        notice_messages.append(f"{attribute_name} is non-zero ({raw_value_int}) (but less than threshold {threshold})")
                     else:
-                        self.debug(f"{attribute_name} is non-zero ({raw_value_int})")
+                        self.debug("%s is non-zero (%s)", attribute_name, raw_value_int)
                         warning_messages.append(f"{attribute_name} is non-zero ({raw_value_int})")
                         self.escalate_status('WARNING')
                 else:
-                    self.debug(f"{attribute_name} is OK ({raw_value_int})")
+                    self.debug("%s is OK (%s)", attribute_name, raw_value_int)
             else:
-                self.debug(f"{attribute_name} not in raw check list (raw value: {raw_value})")
+                self.debug("%s not in raw check list (raw value: %s)", attribute_name, raw_value)
         
         return perfdata
     
-    def parse_scsi_attributes(self, output: List[str], error_messages: List[str],
+    def parse_scsi_attributes(self, output: Iterable[str], error_messages: List[str],
                              warning_messages: List[str]) -> List[str]:
         """Parse SCSI SMART attributes"""
         perfdata = []
-        current_temperature = None
-        max_temperature = None
-        current_start_stop = None
-        max_start_stop = None
+        emit_perfdata = bool(self.args.device)
+        bad_threshold = self.args.bad
+        skip_temp = self.args.skip_temp_check
         
+        values = {}
         for line in output:
-            if 'Current Drive Temperature:' in line:
-                match = re.search(r'Current Drive Temperature:\s+(\d+)', line)
-                if match:
-                    current_temperature = int(match.group(1))
-            
-            elif 'Drive Trip Temperature:' in line:
-                match = re.search(r'Drive Trip Temperature:\s+(\d+)', line)
-                if match:
-                    max_temperature = int(match.group(1))
-            
-            elif 'Current start stop count:' in line:
-                match = re.search(r'Current start stop count:\s+(\d+)', line)
-                if match:
-                    current_start_stop = int(match.group(1))
-            
-            elif 'Recommended maximum start stop count:' in line:
-                match = re.search(r'Recommended maximum start stop count:\s+(\d+)', line)
-                if match:
-                    max_start_stop = int(match.group(1))
+            # Single prefix test drops the bulk of unrelated lines before any splitting
+            if not line.lstrip().startswith(_SCSI_PREFIXES):
+                continue
             
-            elif 'Elements in grown defect list:' in line:
-                match = re.search(r'Elements in grown defect list:\s+(\d+)', line)
-                if match:
-                    defectlist = int(match.group(1))
-                    
-                    if self.args.bad:
-                        perfdata.append(f"defect_list={defectlist};{self.args.bad};{self.args.bad};;")
-                        if defectlist > 0 and defectlist >= self.args.bad:
-                            warning_messages.append(f"{defectlist} Elements in grown defect list (threshold {self.args.bad})")
-                            self.escalate_status('WARNING')
-                            self.debug(f"Elements in grown defect list is non-zero ({defectlist})")
-                        elif defectlist > 0 and defectlist < self.args.bad:
-                            warning_messages.append(f"Note: {defectlist} Elements in grown defect list")
-                            self.debug(f"Elements in grown defect list is non-zero ({defectlist}) but less than {self.args.bad}")
-                    else:
-                        if defectlist > 0:
-                            warning_messages.append(f"{defectlist} Elements in grown defect list")
-                            self.escalate_status('WARNING')
-                            self.debug(f"Elements in grown defect list is non-zero ({defectlist})")
-                        if self.args.device:
-                            perfdata.append(f"defect_list={defectlist};;;;")
+            key, sep, _ = line.partition(':')
+            if not sep:
+                # "Blocks sent to initiator = N" is the only line using '='
+                key, sep, _ = line.partition('=')
+            handler = _SCSI_HANDLERS.get(key.strip())
+            if handler is None:
+                continue
             
-            elif 'Blocks sent to initiator =' in line:
-                match = re.search(r'Blocks sent to initiator =\s+(\d+)', line)
-                if match and self.args.device:
-                    perfdata.append(f"sent_blocks={match.group(1)};;;;")
+            field, pattern = handler
+            match = pattern.search(line)
+            if match:
+                values[field] = int(match.group(1))
+        
+        current_temperature = values.get('current_temperature')
+        max_temperature = values.get('max_temperature')
+        current_start_stop = values.get('current_start_stop')
+        max_start_stop = values.get('max_start_stop')
+        
+        # Handle grown defect list
+        defectlist = values.get('defectlist')
+        if defectlist is not None:
+            if bad_threshold:
+                perfdata.append(_FMT_DEFECT(defectlist, bad_threshold))
+                if defectlist > 0 and defectlist >= bad_threshold:
+                    warning_messages.append(f"{defectlist} Elements in grown defect list (threshold {bad_threshold})")
+                    self.escalate_status('WARNING')
+                    self.debug("Elements in grown defect list is non-zero (%s)", defectlist)
+                elif defectlist > 0 and defectlist < bad_threshold:
+                    warning_messages.append(f"Note: {defectlist} Elements in grown defect list")
+                    self.debug("Elements in grown defect list is non-zero (%s) but less than %s", defectlist, bad_threshold)
+            else:
+                if defectlist > 0:
+                    warning_messages.append(f"{defectlist} Elements in grown defect list")
+                    self.escalate_status('WARNING')
+                    self.debug("Elements in grown defect list is non-zero (%s)", defectlist)
+                if emit_perfdata:
+                    perfdata.append(_FMT_PERF('defect_list', defectlist))
+        
+        if 'sent_blocks' in values and emit_perfdata:
+            perfdata.append(_FMT_PERF('sent_blocks', values['sent_blocks']))
         
         # Handle temperature
         if current_temperature is not None:
             if max_temperature is not None:
-                if self.args.device:
-                    perfdata.append(f"temperature={current_temperature};;{max_temperature};0;")
-                if not self.args.skip_temp_check:
+                if emit_perfdata:
+                    perfdata.append(_FMT_TEMPERATURE(current_temperature, max_temperature))
+                if not skip_temp:
                     if current_temperature > max_temperature:
-                        self.debug(f"Disk temperature is greater than max ({current_temperature} > {max_temperature})")
+                        self.debug("Disk temperature is greater than max (%s > %s)", current_temperature, max_temperature)
                         error_messages.append('Disk temperature is higher than maximum')
                         self.escalate_status('CRITICAL')
             else:
-                if self.args.device:
-                    perfdata.append(f"temperature={current_temperature};;;;")
+                if emit_perfdata:
+                    perfdata.append(_FMT_PERF('temperature', current_temperature))
         
         # Handle start/stop cycles
         if current_start_stop is not None:
             if max_start_stop is not None:
-                if self.args.device:
-                    perfdata.append(f"start_stop={current_start_stop};;;;{max_start_stop}")
+                if emit_perfdata:
+                    perfdata.append(_FMT_START_STOP(current_start_stop, max_start_stop))
                 if current_start_stop > max_start_stop:
-                    self.debug(f"Disk start_stop is greater than max ({current_start_stop} > {max_start_stop})")
+                    self.debug("Disk start_stop is greater than max (%s > %s)", current_start_stop, max_start_stop)
                     warning_messages.append('Disk start_stop is higher than maximum')
                     self.escalate_status('WARNING')
             else:
-                if self.args.device:
-                    perfdata.append(f"start_stop={current_start_stop};;;;")
+                if emit_perfdata:
+                    perfdata.append(_FMT_PERF('start_stop', current_start_stop))
         
         return perfdata
     
     def run(self):
         """Main execution"""
         devices = self.get_devices()
-        interfaces = self.expand_interface(self.args.interface)
+        interfaces = expand_interface(self.args.interface)
         
-        for device in devices:
-            for interface in interfaces:
-                self.check_device(device, interface)
+        # smartctl mostly waits on drive ioctls, so query distinct devices concurrently.
+        # Debug output stays readable by querying one device at a time.
+        workers = 1 if self._dbg else min(32, len(devices))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            fetched = list(executor.map(lambda device: self.fetch_device(device, interfaces), devices))
         
-        # Build final output
-        self.debug(f"final status/output: {self.exit_status}")
+        # Evaluate sequentially in device order so the output does not depend on timing
+        for device, outputs in zip(devices, fetched):
+            for (interface, is_hw_raid), smart_output in zip(interfaces, outputs):
+                self.check_device(device, interface, is_hw_raid, smart_output)
         
-        msg_list = []
-        if self.drive_details:
-            msg_list.append(self.drive_details)
-        
-        # Collect non-OK drives
-        if self.drives_status_critical:
-            self.drives_status_not_okay.extend(self.drives_status_critical)
-        if self.drives_status_warning:
-            self.drives_status_not_okay.extend(self.drives_status_warning)
-        if self.drives_status_unknown:
-            self.drives_status_not_okay.extend(self.drives_status_unknown)
+        # Build final output
+        self.debug("final status/output: %s", self.exit_status)
         
-        if self.drives_status_not_okay:
-            msg_list.extend([x for x in self.drives_status_not_okay if x])
+        # Collect non-OK drives, most severe first
+        self.drives_status_not_okay = self.drives_status_critical + self.drives_status_warning + self.drives_status_unknown
         
         if self.drives_status_not_okay and self.args.quiet and self.drives_status_okay:
-            msg_list.append("Other drives OK")
+            okay_messages = ("Other drives OK",)
         else:
-            msg_list.extend([x for x in self.drives_status_okay if x])
-        
-        if self.args.debug:
-            self.debug(f"drives  ok: {self.drives_status_okay}")
-            self.debug(f"drives nok: {self.drives_status_not_okay}")
-            self.debug(f"msg_list: {'^'.join(msg_list)}")
+            okay_messages = self.drives_status_okay
         
+        # Join all messages in one pass, empty ones were never recorded
+        messages = itertools.chain(
+            (self.drive_details,) if self.drive_details else (),
+            self.drives_status_not_okay,
+            okay_messages
+        )
         separator = self.terminator if self.args.global_pattern else ' '
-        self.status_string = separator.join(msg_list)
+        self.status_string = separator.join(messages)
         
-        # Final output
-        print(f"{self.exit_status}: {self.status_string}|{self.perf_string}")
-        sys.exit(ERRORS[self.exit_status])
+        if self._dbg:
+            self.debug("drives  ok: %s", self.drives_status_okay)
+            self.debug("drives nok: %s", self.drives_status_not_okay)
+            self.debug("status string: %s", self.status_string)
+        
+        # Final output in a single write, then skip interpreter shutdown since
+        # every smartctl process has been reaped and nothing is left to clean up
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.write(1, f"{self.exit_status}: {self.status_string}|{self.perf_string}\n".encode())
+        os._exit(ERRORS[self.exit_status])
 
 
 def print_help():
@@ -808,7 +930,7 @@ Note that -g only works with a fixed interface (e.g. scsi, ata) and megaraid,N.
 Other options
   -i/--interface: device's interface type (auto|ata|scsi|nvme|3ware,N|areca,N|hpt,L/M/N|aacraid,H,L,ID|cciss,N|megaraid,N|usbjmicron,N)
   (See http://www.smartmontools.org/wiki/Supported_RAID-Controllers for interface convention)
-  -r/--raw Comma separated list of ATA or NVMe attributes to check
+  -r/--raw Comma separated list of ATA or NVMe attributes to check (replaces both the ATA and the NVMe default list)
        ATA default: Current_Pending_Sector,Reallocated_Sector_Ct,Program_Fail_Cnt_Total,Uncorrectable_Error_Cnt,Offline_Uncorrectable,Runtime_Bad_Block,Reported_Uncorrect,Reallocated_Event_Count,Command_Timeout
        NVMe default: Media_and_Data_Integrity_Errors
   -b/--bad: Threshold value for Current_Pending_Sector for ATA and 'grown defect list' for SCSI drives
@@ -831,34 +953,61 @@ Other options
     print(help_text)
 
 
-def main():
-    parser = argparse.ArgumentParser(
-        description='Check SMART status of ATA/SCSI/NVMe drives',
-        add_help=False
+# Command line options, see print_help() for their meaning
+_SHORT_OPTIONS = {
+    'd': 'device=', 'g': 'global-pattern=', 'i': 'interface=', 'b': 'bad=',
+    'e': 'exclude=', 'E': 'exclude-all=', 'r': 'raw=', 'w': 'warn=',
+    's': 'selftest', 'l': 'ssd-lifetime', 'O': 'oldage', 'q': 'quiet',
+    'h': 'help', 'v': 'version'
+}
+_LONG_OPTIONS = list(_SHORT_OPTIONS.values()) + [
+    'skip-self-assessment', 'skip-temp-check', 'skip-load-cycles', 'skip-error-log', 'hide-sn', 'debug'
+]
+
+
+def parse_args(argv: List[str]) -> SimpleNamespace:
+    """Parse command line options, raises getopt.GetoptError on bad input"""
+    args = SimpleNamespace(
+        device=None, global_pattern=None, interface=None, bad=None, exclude='', exclude_all='', raw=None, warn=None,
+        selftest=False, ssd_lifetime=False, oldage=False, quiet=False, skip_self_assessment=False,
+        skip_temp_check=False, skip_load_cycles=False, skip_error_log=False, hide_sn=False, debug=False,
+        help=False, version=False
     )
     
-    parser.add_argument('-d', '--device', help='Block device to monitor')
-    parser.add_argument('-g', '--global-pattern', dest='global_pattern', help='Glob pattern for devices')
-    parser.add_argument('-i', '--interface', help='Device interface type')
-    parser.add_argument('-b', '--bad', type=int, help='Threshold for bad sectors')
-    parser.add_argument('-e', '--exclude', default='', help='Exclude attributes from checks')
-    parser.add_argument('-E', '--exclude-all', dest='exclude_all', default='', help='Exclude attributes from checks and perfdata')
-    parser.add_argument('-r', '--raw', help='Raw attributes to check')
-    parser.add_argument('-w', '--warn', help='Warning thresholds')
-    parser.add_argument('-s', '--selftest', action='store_true', help='Enable selftest log check')
-    parser.add_argument('-l', '--ssd-lifetime', dest='ssd_lifetime', action='store_true', help='Check SSD lifetime')
-    parser.add_argument('-O', '--oldage', action='store_true', help='Ignore old age attributes')
-    parser.add_argument('-q', '--quiet', action='store_true', help='Only show faulted drives')
-    parser.add_argument('--skip-self-assessment', dest='skip_self_assessment', action='store_true', help='Skip SMART self-assessment')
-    parser.add_argument('--skip-temp-check', dest='skip_temp_check', action='store_true', help='Skip temperature check')
-    parser.add_argument('--skip-load-cycles', dest='skip_load_cycles', action='store_true', help='Skip load cycle check')
-    parser.add_argument('--skip-error-log', dest='skip_error_log', action='store_true', help='Skip error log check')
-    parser.add_argument('--hide-sn', dest='hide_sn', action='store_true', help='Hide serial number')
-    parser.add_argument('--debug', action='store_true', help='Debug output')
-    parser.add_argument('-h', '--help', action='store_true', help='Show help')
-    parser.add_argument('-v', '--version', action='store_true', help='Show version')
+    short_options = ''.join(opt + (':' if name.endswith('=') else '') for opt, name in _SHORT_OPTIONS.items())
+    opts, extra = getopt.gnu_getopt(argv, short_options, _LONG_OPTIONS)
+    if extra:
+        raise getopt.GetoptError(f"unrecognized arguments: {' '.join(extra)}")
+    
+    for opt, value in opts:
+        if opt.startswith('--'):
+            name = opt[2:]
+        else:
+            name = _SHORT_OPTIONS[opt[1]].rstrip('=')
+            # Accept the -d=/dev/sda form
+            if value.startswith('='):
+                value = value[1:]
+        
+        attribute = name.replace('-', '_')
+        if attribute == 'bad':
+            if not value.isdigit():
+                raise getopt.GetoptError(f"option {opt} requires a number, not '{value}'")
+            args.bad = int(value)
+        elif name + '=' in _LONG_OPTIONS:
+            setattr(args, attribute, value)
+        else:
+            setattr(args, attribute, True)
     
-    args = parser.parse_args()
+    return args
+
+
+def main():
+    try:
+        args = parse_args(sys.argv[1:])
+    except getopt.GetoptError as e:
+        print(f"UNKNOWN - {e}\n")
+        print_help()
+        sys.exit(ERRORS['UNKNOWN'])
     
     if args.help:
         print_help()
@@ -882,8 +1031,7 @@ def main():
         sys.exit(ERRORS['UNKNOWN'])
     
     # Validate interface
-    valid_interfaces = r'^(ata|scsi|3ware|areca|hpt|aacraid|cciss|megaraid|sat|auto|nvme|usbjmicron)'
-    if not re.match(valid_interfaces, args.interface):
+    if _RE_IFACE_SEP.split(args.interface, 1)[0] not in _VALID_IFACES:
         print(f"invalid interface {args.interface}!\n")
         print_help()
         sys.exit(ERRORS['UNKNOWN'])
@@ -13,11 +13,15 @@ Copyright (C) 2024 - GPLv3 License
 """
 
 import argparse
+import heapq
 import os
+import queue
+import re
+import stat
 import sys
-import subprocess
+import threading
 from pathlib import Path
-from typing import List, Dict, Tuple, Set
+from typing import Iterable, List, Dict, Tuple, Set
 from dataclasses import dataclass
 
 try:
@@ -32,6 +36,26 @@ NAGIOS_WARNING = 1
 NAGIOS_CRITICAL = 2
 NAGIOS_UNKNOWN = 3
 
+# Units used by _format_size, each one 1024 times the previous
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+# Always exclude these system directories
+SYSTEM_EXCLUDES = ('/proc', '/sys', '/dev', '/run', '/tmp', '/sys/firmware/efi/efivars')
+
+# Characters replaced by '_' in perfdata labels
+_PERF_LABEL_TABLE = str.maketrans({'/': '_', ' ': '_'})
+
+# Mount table, read once per process and shared by the network and local mount lookups
+_PARTITIONS_CACHE = None
+
+
+def _disk_partitions():
+    """Return all mounted partitions, cached after the first call"""
+    global _PARTITIONS_CACHE
+    if _PARTITIONS_CACHE is None:
+        _PARTITIONS_CACHE = psutil.disk_partitions(all=True)
+    return _PARTITIONS_CACHE
+
 
 @dataclass
 class DirectorySize:
@@ -52,8 +76,23 @@ class SpaceUsageChecker:
         self.top_n = top_n
         self.exclude_paths = exclude_paths or []
         self.verbose = verbose
+        self._size_cache: Dict[str, int] = {}
+        self._cache_lock = threading.Lock()
         self.network_mounts = self._get_network_mounts()
-        self.mountpoints = self._get_mountpoints()
+        self.mountpoints = frozenset(self._get_mountpoints())
+        
+        # Every directory with a mount point somewhere below it. The size walks add
+        # directories on another device that the mount table doesn't list
+        self._mount_ancestors: Set[str] = set()
+        self._add_mount_ancestors(self.mountpoints)
+        
+        # Prefix tuple so the under-a-network-mount test is a single str.startswith call
+        self._network_prefixes = tuple(nm + '/' for nm in self.network_mounts)
+        
+        # All explicit and system exclusions as one anchored alternation, matching the
+        # excluded directory itself or anything below it but not siblings like /tmp_foo
+        excludes = [exclude.rstrip('/') for exclude in self.exclude_paths] + list(SYSTEM_EXCLUDES)
+        self._exclude_re = re.compile('(?:' + '|'.join(map(re.escape, excludes)) + ')(?:/|$)')
         
         if self.verbose:
             print(f"DEBUG: Analyzing path: {self.path}")
@@ -70,10 +109,10 @@ class SpaceUsageChecker:
         network_fstypes = {'cifs', 'nfs', 'nfs4', 'smbfs', 'davfs', 'fuse.sshfs'}
         
         try:
-            partitions = psutil.disk_partitions(all=True)
-            for partition in partitions:
+            # Mount table entries are already absolute and canonical, no resolve() needed
+            for partition in _disk_partitions():
                 if partition.fstype.lower() in network_fstypes:
-                    network_mounts.add(str(Path(partition.mountpoint).resolve()))
+                    network_mounts.add(os.path.normpath(partition.mountpoint))
         except Exception as e:
             if self.verbose:
                 print(f"DEBUG: Error getting network mounts: {e}")
@@ -87,15 +126,14 @@ class SpaceUsageChecker:
         
         try:
             # Use psutil to get mount points
-            partitions = psutil.disk_partitions(all=True)
-            for partition in partitions:
+            for partition in _disk_partitions():
                 # Skip network filesystems
                 if partition.fstype.lower() in network_fstypes:
                     if self.verbose:
                         print(f"DEBUG: Skipping network mount: {partition.mountpoint} (type: {partition.fstype})")
                     continue
                     
-                mountpoints.add(str(Path(partition.mountpoint).resolve()))
+                mountpoints.add(os.path.normpath(partition.mountpoint))
                 
         except Exception as e:
             if self.verbose:
@@ -103,10 +141,20 @@ class SpaceUsageChecker:
         
         return mountpoints
     
+    def _add_mount_ancestors(self, paths: Iterable[str]):
+        """Record every parent directory of the given mount points"""
+        mount_ancestors = self._mount_ancestors
+        for path in paths:
+            parent = os.path.dirname(path)
+            while parent not in mount_ancestors:
+                mount_ancestors.add(parent)
+                parent = os.path.dirname(parent)
+    
     def _is_mountpoint(self, path: Path) -> bool:
         """Check if a path is a mount point"""
-        resolved = str(path.resolve())
-        return resolved in self.mountpoints
+        # Subdirectories of the resolved scan root only need resolving when they
+        # are symlinks, iterdir() follows those into wherever they point
+        return str(path.resolve() if path.is_symlink() else path) in self.mountpoints
     
     def _should_exclude(self, path: Path) -> bool:
         """Check if a path should be excluded from analysis"""
@@ -119,77 +167,159 @@ class SpaceUsageChecker:
             return True
         
         # Check if path is under a network mount
-        for network_mount in self.network_mounts:
-            if path_str.startswith(network_mount + '/') or path_str == network_mount:
-                if self.verbose:
-                    print(f"DEBUG: Excluding path under network mount: {path_str}")
-                return True
-        
-        # Check explicit exclusions
-        for exclude in self.exclude_paths:
-            if path_str.startswith(exclude):
-                return True
-        
-        # Always exclude these system directories
-        system_excludes = [
-            '/proc', '/sys', '/dev', '/run', '/tmp',
-            '/sys/firmware/efi/efivars'
-        ]
-        
-        for exclude in system_excludes:
-            if path_str.startswith(exclude):
-                return True
+        if path_str.startswith(self._network_prefixes):
+            if self.verbose:
+                print(f"DEBUG: Excluding path under network mount: {path_str}")
+            return True
         
-        return False
+        # Check explicit and system exclusions
+        return self._exclude_re.match(path_str) is not None
     
-    def _get_directory_size_du(self, path: Path) -> int:
-        """Get directory size using du command (respects mount points)"""
-        try:
-            # Use du with --one-file-system to respect mount points
-            result = subprocess.run(
-                ['du', '-sb', '--one-file-system', str(path)],
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
-            )
+    def _walk_size(self, root: Path) -> int:
+        """Get directory size like du -sb --one-file-system, caching every directory walked"""
+        root_str = str(root)
+        cached = self._size_cache.get(root_str)
+        if cached is None:
+            self._walk_sizes([root_str])
+            cached = self._size_cache.get(root_str, 0)
+        return cached
+    
+    def _walk_sizes(self, roots: List[str]):
+        """Size several directory trees with a pool of workers sharing one directory queue"""
+        # Per directory: own size plus plain files, files with several hard links
+        # (kept so each is only counted once), parent and visiting order
+        sizes: Dict[str, int] = {}
+        links: Dict[str, Dict[Tuple[int, int], int]] = {}
+        parents: Dict[str, str] = {}
+        order: List[str] = []
+        foreign: List[str] = []
+        work: queue.Queue = queue.Queue()
+        is_dir = stat.S_ISDIR
+        join = os.path.join
+        
+        for root in roots:
+            try:
+                root_stat = os.lstat(root)
+            except OSError as e:
+                if self.verbose:
+                    print(f"DEBUG: Error calculating size for {root}: {e}")
+                continue
             
-            if result.returncode == 0:
-                # Parse output: "size\tpath"
-                size_str = result.stdout.split()[0]
-                return int(size_str)
-            else:
+            # Like du, a symlink given as argument is not followed
+            if not is_dir(root_stat.st_mode):
+                with self._cache_lock:
+                    self._size_cache[root] = root_stat.st_size
+                continue
+            
+            sizes[root] = root_stat.st_size
+            work.put((root, root_stat.st_dev))
+        
+        def scan(current: str, root_dev: int):
+            # Parents are always recorded before their subdirectories are queued
+            order.append(current)
+            file_bytes = 0
+            try:
+                # Scanning through a directory fd makes every entry.stat() an fstatat()
+                # relative to it instead of resolving the full path again
+                fd = os.open(current, os.O_RDONLY | os.O_DIRECTORY)
+                try:
+                    with os.scandir(fd) as it:
+                        for entry in it:
+                            try:
+                                st = entry.stat(follow_symlinks=False)
+                            except OSError:
+                                continue
+                            
+                            # Stay on one filesystem, nested mounts are reported on their own.
+                            # Remember foreign directories, they may be missing from the mount table
+                            if st.st_dev != root_dev:
+                                if is_dir(st.st_mode):
+                                    foreign.append(join(current, entry.name))
+                                continue
+                            
+                            if is_dir(st.st_mode):
+                                child = join(current, entry.name)
+                                sizes[child] = st.st_size
+                                parents[child] = current
+                                work.put((child, root_dev))
+                            elif st.st_nlink > 1:
+                                links.setdefault(current, {})[(st.st_dev, st.st_ino)] = st.st_size
+                            else:
+                                file_bytes += st.st_size
+                finally:
+                    os.close(fd)
+            except OSError as e:
                 if self.verbose:
-                    print(f"DEBUG: du failed for {path}: {result.stderr}")
-                return 0
-                
-        except subprocess.TimeoutExpired:
-            if self.verbose:
-                print(f"DEBUG: Timeout calculating size for {path}")
-            return 0
-        except Exception as e:
-            if self.verbose:
-                print(f"DEBUG: Error calculating size for {path}: {e}")
-            return 0
+                    print(f"DEBUG: Error reading {current}: {e}")
+            sizes[current] += file_bytes
+        
+        def worker():
+            while True:
+                item = work.get()
+                if item is None:
+                    return
+                try:
+                    scan(*item)
+                except Exception as e:
+                    if self.verbose:
+                        print(f"DEBUG: Error scanning {item[0]}: {e}")
+                finally:
+                    work.task_done()
+        
+        if work.empty():
+            return
+        
+        # Workers pull single directories, so one deep tree does not hold up the rest
+        workers = [threading.Thread(target=worker, daemon=True)
+                   for _ in range(min(32, (os.cpu_count() or 1) * 4))]
+        for thread in workers:
+            thread.start()
+        work.join()
+        for _ in workers:
+            work.put(None)
+        for thread in workers:
+            thread.join()
+        
+        # Every directory comes after its parent in order, so walking it backwards
+        # finishes each subtree before it is added to its parent
+        totals = {}
+        for path in reversed(order):
+            path_links = links.get(path)
+            if path_links:
+                totals[path] = sizes[path] + sum(path_links.values())
+            else:
+                totals[path] = sizes[path]
+            
+            parent = parents.get(path)
+            if parent is not None:
+                sizes[parent] += sizes[path]
+                if path_links:
+                    links.setdefault(parent, {}).update(path_links)
+        
+        with self._cache_lock:
+            self._size_cache.update(totals)
+            self._add_mount_ancestors(foreign)
     
     def _format_size(self, size_bytes: int) -> str:
         """Format bytes to human readable format"""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f}{unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f}PB"
-    
-    def _analyze_directory(self, path: Path, current_depth: int = 0) -> List[DirectorySize]:
-        """Recursively analyze directory sizes"""
-        results = []
+        if size_bytes < 1024:
+            return f"{size_bytes:.1f}B"
         
+        # 1024 == 2**10, so the unit follows directly from the bit length
+        unit = min((size_bytes.bit_length() - 1) // 10, 5)
+        return f"{size_bytes / (1 << (10 * unit)):.1f}{SIZE_UNITS[unit]}"
+    
+    def _analyze_directory(self, path: Path, current_depth: int,
+                           paths: List[str], sizes: List[int], mounts: List[bool], top: List[int]):
+        """Recursively analyze directory sizes into the parallel paths/sizes/mounts lists"""
         if current_depth > self.depth:
-            return results
+            return
         
         try:
             # Get immediate subdirectories
             subdirs = [d for d in path.iterdir() if d.is_dir()]
             
+            candidates = []
             for subdir in subdirs:
                 # Skip excluded paths
                 if self._should_exclude(subdir):
@@ -198,8 +328,14 @@ class SpaceUsageChecker:
                     continue
                 
                 # Check if it's a mount point
-                is_mount = self._is_mountpoint(subdir)
-                
+                candidates.append((subdir, self._is_mountpoint(subdir)))
+            
+            # Size all top-level trees in one parallel walk, deeper levels are then
+            # answered from the size cache
+            if current_depth == 0:
+                self._walk_sizes([str(subdir) for subdir, is_mount in candidates if not is_mount])
+            
+            for subdir, is_mount in candidates:
                 if is_mount:
                     # For mount points, get the filesystem size instead of directory size
                     if self.verbose:
@@ -213,22 +349,36 @@ class SpaceUsageChecker:
                             print(f"DEBUG: Error getting mount stats for {subdir}: {e}")
                         size_bytes = 0
                 else:
-                    # For regular directories, use du to get size (respecting nested mounts)
+                    # For regular directories, walk the tree in-process (respecting nested mounts)
                     if self.verbose:
                         print(f"DEBUG: Calculating size for {subdir} (depth {current_depth})")
-                    size_bytes = self._get_directory_size_du(subdir)
+                    size_bytes = self._walk_size(subdir)
                 
                 if size_bytes > 0:
-                    results.append(DirectorySize(
-                        path=str(subdir),
-                        size_bytes=size_bytes,
-                        size_human=self._format_size(size_bytes),
-                        is_mountpoint=is_mount
-                    ))
+                    paths.append(str(subdir))
+                    sizes.append(size_bytes)
+                    mounts.append(is_mount)
+                    
+                    # Min-heap of the N largest sizes seen so far
+                    if len(top) < self.top_n:
+                        heapq.heappush(top, size_bytes)
+                    else:
+                        heapq.heappushpop(top, size_bytes)
+                
+                # Subdirectories are never larger than their parent, so a tree smaller than
+                # the current N-th largest can't place in the top N unless a mount or another
+                # device (e.g. an unlisted btrfs subvolume) is below it.
+                # That doesn't hold for a symlinked directory: only the link itself is sized,
+                # but the recursion below follows it
+                if (top and len(top) >= self.top_n and size_bytes < top[0]
+                        and str(subdir) not in self._mount_ancestors and not subdir.is_symlink()):
+                    if self.verbose:
+                        print(f"DEBUG: Pruning {subdir}, smaller than current top {self.top_n}")
+                    continue
                 
                 # Recurse into subdirectories if not a mount point and not at max depth
                 if not is_mount and current_depth < self.depth:
-                    results.extend(self._analyze_directory(subdir, current_depth + 1))
+                    self._analyze_directory(subdir, current_depth + 1, paths, sizes, mounts, top)
                     
         except PermissionError:
             if self.verbose:
@@ -236,8 +386,6 @@ class SpaceUsageChecker:
         except Exception as e:
             if self.verbose:
                 print(f"DEBUG: Error analyzing {path}: {e}")
-        
-        return results
     
     def analyze(self) -> List[DirectorySize]:
         """Perform the space usage analysis"""
@@ -250,16 +398,27 @@ class SpaceUsageChecker:
         if self.verbose:
             print(f"DEBUG: Starting analysis at depth {self.depth}")
         
-        # Analyze the directory tree
-        results = self._analyze_directory(self.path, current_depth=0)
-        
-        # Sort by size (descending) and return top N
-        results.sort(key=lambda x: x.size_bytes, reverse=True)
+        # Analyze the directory tree, kept as parallel lists so only the top N
+        # entries are ever turned into DirectorySize objects
+        paths: List[str] = []
+        sizes: List[int] = []
+        mounts: List[bool] = []
+        self._analyze_directory(self.path, 0, paths, sizes, mounts, [])
         
         if self.verbose:
-            print(f"DEBUG: Found {len(results)} directories, returning top {self.top_n}")
-        
-        return results[:self.top_n]
+            print(f"DEBUG: Found {len(paths)} directories, returning top {self.top_n}")
+        
+        # Select the top N by size (descending) without sorting everything
+        top = heapq.nlargest(self.top_n, range(len(sizes)), key=sizes.__getitem__)
+        return [
+            DirectorySize(
+                path=paths[i],
+                size_bytes=sizes[i],
+                size_human=self._format_size(sizes[i]),
+                is_mountpoint=mounts[i]
+            )
+            for i in top
+        ]
 
 
 def check_space_usage(args) -> Tuple[int, str]:
@@ -328,9 +487,7 @@ def check_space_usage(args) -> Tuple[int, str]:
         # Add top directories as perfdata
         for i, dir_info in enumerate(results[:5], 1):
             # Sanitize path for perfdata (remove special chars)
-            label = dir_info.path.replace('/', '_').replace(' ', '_').strip('_')
-            if len(label) > 20:
-                label = label[:20]
+            label = dir_info.path.translate(_PERF_LABEL_TABLE).strip('_')[:20]
             perf_data.append(f"dir{i}_{label}={dir_info.size_bytes}B;;;;")
         
         final_message = status_msg
@@ -14,11 +14,55 @@ and generate Icinga2 CheckCommand definitions.
 import re
 import os
 import sys
+import io
+import json
 import argparse
+import contextlib
+import mmap
+import multiprocessing
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 
+# C sources: start of the getopt_long option table or of print_help(), both found in one
+# scan of the mapped bytes, the end of each section, and the decoded table entries
+# {"name", required_argument, 0, 'x'}
+_RE_C_SECTION = re.compile(rb'(static\s+struct\s+option\s+longopts\[\s*\]\s*=\s*\{)|void\s+print_help')
+_RE_LONGOPTS_END = re.compile(rb'\{0,\s*0,\s*0,\s*0\}')
+_RE_HELP_END = re.compile(rb'^}', re.MULTILINE)
+_RE_C_OPTION = re.compile(r'\{"([^"]+)",\s*(no_argument|required_argument|optional_argument),\s*0,\s*\'(.)\'\}')
+
+# C sources: every printf line in print_help() together with the up to five
+# printf statements following it that hold the description
+_RE_HELP_ENTRY = re.compile(r'^.*?printf(.*)\n(?=((?:\s*printf\s*\([^;]+;\s*\n){1,5}))', re.MULTILINE | re.IGNORECASE)
+# "-x, --long" mentions in those lines, and bare "-x," or "-x " ones
+_RE_HELP_SHORT_LONG = re.compile(r'-(.),?\s+--')
+_RE_SHORT_MENTION = re.compile(r'-(?=(.)[,\s])')
+_RE_PRINTF_STRING = re.compile(r'printf\s*\([^"]*"([^"]+)"')
+_RE_WHITESPACE = re.compile(r'\s+')
+
+# Perl sources: the opening of the GetOptions() call, the parentheses used to find
+# its end, and its "spec" => \$variable pairs
+_RE_GETOPTIONS = re.compile(r'GetOptions\s*\(')
+_RE_PARENS = re.compile(r'[()]')
+_RE_PERL_OPTION = re.compile(r'"([^"]+)"\s*=>\s*\\?\$(\w+)')
+
+def _decode_source(data: bytes) -> str:
+    """Decode part of a source file the way text mode reading would."""
+    return data.decode('utf-8', errors='ignore').replace('\r\n', '\n').replace('\r', '\n')
+
+def _call_arguments(text: str, start: int) -> Optional[str]:
+    """Return the text from start up to the parenthesis closing the call opened just before it."""
+    depth = 1
+    for paren in _RE_PARENS.finditer(text, start):
+        depth += 1 if paren.group() == '(' else -1
+        if not depth:
+            return text[start:paren.start()]
+    
+    # Unbalanced, fall back to the first closing parenthesis
+    end = text.find(')', start)
+    return text[start:end] if end >= 0 else None
+
 class PluginOption:
     def __init__(self, short: str = None, long: str = None, 
                  has_arg: str = None, description: str = ""):
@@ -41,6 +85,26 @@ class PluginParser:
         
     def parse(self) -> bool:
         """Parse the source file and extract options."""
+        # C sources are only searched for two sections, so they are mapped read-only
+        # and just those sections get decoded
+        if self.source_file.suffix == '.c':
+            try:
+                with open(self.source_file, 'rb') as f:
+                    if os.fstat(f.fileno()).st_size:
+                        self.content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    else:
+                        self.content = b''
+            except Exception as e:
+                print(f"Error reading {self.source_file}: {e}")
+                return False
+            
+            try:
+                return self.parse_c_file()
+            finally:
+                if isinstance(self.content, mmap.mmap):
+                    self.content.close()
+                self.content = ""
+        
         try:
             with open(self.source_file, 'r', encoding='utf-8', errors='ignore') as f:
                 self.content = f.read()
@@ -49,33 +113,52 @@ class PluginParser:
             return False
             
         # Determine file type and use appropriate parser
-        if self.source_file.suffix == '.c':
-            return self.parse_c_file()
-        elif self.source_file.suffix == '.pl':
+        if self.source_file.suffix == '.pl':
             return self.parse_perl_file()
         elif self.source_file.suffix in ['.py', '.sh']:
             return self.parse_script_file()
         else:
             return False
     
+    def find_c_sections(self) -> Tuple[Optional[str], Optional[str]]:
+        """Locate the longopts table and the print_help() body in one pass over the mapped source."""
+        longopts_start = help_start = None
+        for match in _RE_C_SECTION.finditer(self.content):
+            if match.group(1):
+                if longopts_start is None:
+                    longopts_start = match.end()
+            elif help_start is None:
+                help_start = match.end()
+            if longopts_start is not None and help_start is not None:
+                break
+        
+        longopts_content = None
+        if longopts_start is not None:
+            end_match = _RE_LONGOPTS_END.search(self.content, longopts_start)
+            if end_match:
+                longopts_content = _decode_source(self.content[longopts_start:end_match.start()])
+        
+        help_content = None
+        if help_start is not None:
+            body_start = self.content.find(b'{', help_start) + 1
+            if body_start:
+                end_match = _RE_HELP_END.search(self.content, body_start)
+                if end_match:
+                    help_content = _decode_source(self.content[body_start:end_match.start()])
+        
+        return longopts_content, help_content
+    
     def parse_c_file(self) -> bool:
         """Parse C source file for getopt_long options."""
-        # Find the longopts struct array
-        longopts_match = re.search(
-            r'static\s+struct\s+option\s+longopts\[\s*\]\s*=\s*\{(.*?)\{0,\s*0,\s*0,\s*0\}',
-            self.content, re.DOTALL
-        )
+        # Find the longopts struct array and print_help()
+        longopts_content, help_content = self.find_c_sections()
         
-        if not longopts_match:
+        if longopts_content is None:
             print(f"  No longopts found in {self.plugin_name}")
             return False
         
-        longopts_content = longopts_match.group(1)
-        
         # Parse each option line: {"name", required_argument, 0, 'x'}
-        option_pattern = r'\{"([^"]+)",\s*(no_argument|required_argument|optional_argument),\s*0,\s*\'(.)\'\}'
-        
-        for match in re.finditer(option_pattern, longopts_content):
+        for match in _RE_C_OPTION.finditer(longopts_content):
             long_name = match.group(1)
             has_arg = match.group(2)
             short_name = match.group(3)
@@ -88,48 +171,50 @@ class PluginParser:
             self.options.append(opt)
         
         # Try to extract descriptions from print_help()
-        self.extract_c_descriptions()
+        if help_content is not None:
+            self.extract_c_descriptions(help_content)
         
         return len(self.options) > 0
     
-    def extract_c_descriptions(self):
-        """Extract option descriptions from print_help() function."""
-        # Find print_help function
-        help_match = re.search(r'void\s+print_help.*?\{(.*?)^}', self.content, re.DOTALL | re.MULTILINE)
-        if not help_match:
-            return
-            
-        help_content = help_match.group(1)
-        
+    def extract_c_descriptions(self, help_content: str):
+        """Extract option descriptions from the body of the print_help() function."""
         # Look for patterns like: printf (" %s\n", "-U, --upgrade=OPTS");
-        # followed by description lines
+        # followed by description lines. Collect them all in one pass and index
+        # the "-x, --long" mentions by their lowercased short option.
+        entries = []
+        by_short: Dict[str, List[Tuple[int, str]]] = {}
+        for entry in _RE_HELP_ENTRY.finditer(help_content):
+            line = entry.group(1).lower()
+            index = len(entries)
+            entries.append((line, entry.group(2)))
+            for mention in _RE_HELP_SHORT_LONG.finditer(line):
+                by_short.setdefault(mention.group(1), []).append((index, line[mention.end():]))
+        
         for opt in self.options:
-            # Build search pattern for this option
-            patterns = []
+            found = None
             if opt.short and opt.long:
-                patterns.append(rf'-{opt.short},?\s+--{opt.long}')
+                long_name = opt.long.lower()
+                for index, rest in by_short.get(opt.short.lower(), ()):
+                    if rest.startswith(long_name):
+                        found = index
+                        break
             elif opt.long:
-                patterns.append(rf'--{opt.long}')
+                needle = f'--{opt.long}'.lower()
+                found = next((i for i, (line, _) in enumerate(entries) if needle in line), None)
             elif opt.short:
-                patterns.append(rf'-{opt.short}[,\s]')
-                
-            for pattern in patterns:
-                # Find the option line and grab next few description lines
-                opt_match = re.search(
-                    rf'printf.*?{pattern}.*?\n((?:\s*printf\s*\([^;]+;\s*\n){{1,5}})',
-                    help_content, re.IGNORECASE
-                )
-                
-                if opt_match:
-                    desc_lines = opt_match.group(1)
-                    # Extract strings from printf calls
-                    desc_parts = re.findall(r'printf\s*\([^"]*"([^"]+)"', desc_lines)
-                    description = ' '.join(desc_parts).strip()
-                    # Clean up
-                    description = re.sub(r'%s', '', description)
-                    description = re.sub(r'\s+', ' ', description)
-                    opt.description = description
-                    break
+                short_name = opt.short.lower()
+                found = next((i for i, (line, _) in enumerate(entries)
+                              if short_name in _RE_SHORT_MENTION.findall(line)), None)
+            
+            if found is not None:
+                desc_lines = entries[found][1]
+                # Extract strings from printf calls
+                desc_parts = _RE_PRINTF_STRING.findall(desc_lines)
+                description = ' '.join(desc_parts).strip()
+                # Clean up
+                description = description.replace('%s', '')
+                description = _RE_WHITESPACE.sub(' ', description)
+                opt.description = description
     
     def parse_perl_file(self) -> bool:
         """Parse Perl script for Getopt::Long options."""
@@ -137,26 +222,20 @@ class PluginParser:
         # GetOptions(...);
         # GetOptions
         #     ("opt" => ...);
-        getopts_match = re.search(
-            r'GetOptions\s*\((.*?)\)',
-            self.content, re.DOTALL
-        )
+        getopts_match = _RE_GETOPTIONS.search(self.content)
+        getopts_content = _call_arguments(self.content, getopts_match.end()) if getopts_match else None
         
-        if not getopts_match:
+        if getopts_content is None:
             print(f"  No GetOptions found in {self.plugin_name}")
             return False
         
-        getopts_content = getopts_match.group(1)
-        
         # Parse option specs in format: "V" => \$opt_V, "version" => \$opt_V,
         # or "w=s" => \$opt_w, "warning=s" => \$opt_w,
         # Pattern matches: "option_spec" => \$variable
-        option_pattern = r'"([^"]+)"\s*=>\s*\\?\$(\w+)'
-        
         # Track options by variable name to group short/long forms
         opt_by_var = {}
         
-        for match in re.finditer(option_pattern, getopts_content):
+        for match in _RE_PERL_OPTION.finditer(getopts_content):
             opt_spec = match.group(1)
             var_name = match.group(2)
             
@@ -201,20 +280,18 @@ class PluginParser:
     
     def generate_icinga_command(self) -> str:
         """Generate Icinga2 CheckCommand definition."""
+        plugin_name = self.plugin_name
         lines = []
+        add = lines.append
         # Apply command prefix if specified
-        command_name = f"{self.command_prefix}_{self.plugin_name}" if self.command_prefix else self.plugin_name
-        lines.append(f'object CheckCommand "{command_name}" {{')
-        lines.append('  import "plugin-check-command"')
+        command_name = f"{self.command_prefix}_{plugin_name}" if self.command_prefix else plugin_name
+        add(f'object CheckCommand "{command_name}" {{\n  import "plugin-check-command"')
         
         # Use static path if provided, otherwise use PluginDir variable
         if self.plugin_dir:
-            lines.append(f'  command = [ "{self.plugin_dir}/{self.plugin_name}" ]')
+            add(f'  command = [ "{self.plugin_dir}/{plugin_name}" ]\n\n  arguments = {{')
         else:
-            lines.append(f'  command = [ PluginDir + "/{self.plugin_name}" ]')
-        
-        lines.append('')
-        lines.append('  arguments = {')
+            add(f'  command = [ PluginDir + "/{plugin_name}" ]\n\n  arguments = {{')
         
         hostname_var = None
         
@@ -225,73 +302,142 @@ class PluginParser:
                 continue
                 
             var_name = opt_name.replace('-', '_')
+            takes_value = opt.has_arg in ('required_argument', 'optional_argument')
             
             # Track hostname parameter for later vars assignment
-            if opt_name in ['hostname', 'host', 'Hostname'] and opt.has_arg in ['required_argument', 'optional_argument']:
-                if not hostname_var:  # Use first hostname parameter found
-                    hostname_var = f'{self.plugin_name}_{var_name}'
-            
-            # Build argument block - prefer long form
-            if opt.long:
-                arg_key = f'--{opt.long}'
-            else:
-                arg_key = f'-{opt.short}'
-            
-            lines.append(f'    "{arg_key}" = {{')
+            if takes_value and not hostname_var and opt_name in ('hostname', 'host', 'Hostname'):
+                # Use first hostname parameter found
+                hostname_var = f'{plugin_name}_{var_name}'
             
-            if opt.has_arg in ['required_argument', 'optional_argument']:
-                lines.append(f'      value = "${self.plugin_name}_{var_name}$"')
-                if opt.description:
-                    lines.append(f'      description = "{opt.description[:80]}"')
-            else:
-                # Boolean flag
-                lines.append(f'      set_if = "${self.plugin_name}_{var_name}$"')
-                if opt.description:
-                    lines.append(f'      description = "{opt.description[:80]}"')
-            
-            lines.append('    }')
+            # Build argument block - prefer long form, value for options with an
+            # argument and set_if for boolean flags
+            arg_key = f'--{opt.long}' if opt.long else f'-{opt.short}'
+            setter = 'value' if takes_value else 'set_if'
+            add(f'    "{arg_key}" = {{\n      {setter} = "${plugin_name}_{var_name}$"')
+            if opt.description:
+                add(f'      description = "{opt.description[:80]}"')
+            add('    }')
         
-        lines.append('  }')
+        add('  }')
         
         # Add default vars assignment for hostname parameter
         if hostname_var:
-            lines.append('')
-            lines.append(f'  vars.{hostname_var} = "$address$"')
+            add(f'\n  vars.{hostname_var} = "$address$"')
         
-        lines.append('}')
-        lines.append('')
+        add('}\n')
         
         return '\n'.join(lines)
 
+def _process_one(job: Tuple[Path, Optional[str], Optional[str]]) -> Tuple[PluginParser, bool, str, str]:
+    """Parse one plugin file in a worker, returning parser, success, command definition and printed output."""
+    plugin_file, plugin_dir, command_prefix = job
+    parser_instance = PluginParser(plugin_file, plugin_dir=plugin_dir, command_prefix=command_prefix)
+    
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        parsed = parser_instance.parse()
+    command_def = parser_instance.generate_icinga_command() if parsed else ''
+    
+    # The source text is not needed anymore, don't send it back
+    parser_instance.content = ""
+    return parser_instance, parsed, command_def, output.getvalue()
+
+# parseprogress.txt is written as an append-only journal while parsing, one
+# line per status change, and compacted to the latest entry per plugin at the end
+_PROGRESS_FH = None
+
 def update_progress(filename: str, status: str, notes: str = "", progress_file: Optional[Path] = None):
-    """Update parseprogress.txt with parsing status."""
+    """Append a parsing status entry to parseprogress.txt."""
+    global _PROGRESS_FH
     if not progress_file:
         return
     
+    if _PROGRESS_FH is None:
+        # Make sure the first entry doesn't continue an unterminated last line
+        needs_newline = False
+        if progress_file.exists() and progress_file.stat().st_size:
+            with progress_file.open('rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b'\n'
+        _PROGRESS_FH = progress_file.open('a', buffering=1)
+        if needs_newline:
+            _PROGRESS_FH.write('\n')
+    
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    _PROGRESS_FH.write(f"{filename}|{status}|{timestamp}|{notes}\n")
+
+def compact_progress(progress_file: Path):
+    """Rewrite parseprogress.txt keeping only the latest entry per plugin."""
+    global _PROGRESS_FH
+    if _PROGRESS_FH is not None:
+        _PROGRESS_FH.close()
+        _PROGRESS_FH = None
     
-    # Create progress file if it doesn't exist
     if not progress_file.exists():
-        progress_file.write_text(f"{filename}|{status}|{timestamp}|{notes}\n")
         return
     
-    # Read all lines
-    lines = progress_file.read_text().split('\n')
-    
-    # Update the matching line
-    updated = False
-    for i, line in enumerate(lines):
-        if line.startswith(filename + '|'):
-            lines[i] = f"{filename}|{status}|{timestamp}|{notes}"
-            updated = True
-            break
-    
-    # Add new line if not found
-    if not updated:
-        lines.append(f"{filename}|{status}|{timestamp}|{notes}")
-    
-    # Write back
-    progress_file.write_text('\n'.join(lines))
+    # Entries keep the position of their first appearance and their line ending
+    latest = {}
+    with progress_file.open() as f:
+        for line in f:
+            filename, sep, _ = line.partition('|')
+            if sep:
+                latest[filename] = line if line.endswith('\n') else line + '\n'
+    progress_file.write_text(''.join(latest.values()))
+
+# Parse results from earlier runs, keyed by source path, mtime and size. The whole
+# cache is dropped when this script changes since results may differ then.
+def _cache_key(plugin_file: Path) -> Optional[str]:
+    """Key a source file's cached parse result on its path, mtime and size."""
+    try:
+        st = plugin_file.stat()
+    except OSError:
+        return None
+    return f"{plugin_file}|{st.st_mtime_ns}|{st.st_size}"
+
+def load_parse_cache(cache_file: Path) -> Dict[str, dict]:
+    """Load cached parse results written by an earlier run of this same script."""
+    try:
+        data = json.loads(cache_file.read_text())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get('parser') != os.stat(__file__).st_mtime_ns:
+        return {}
+    return data.get('entries', {})
+
+def save_parse_cache(cache_file: Path, entries: Dict[str, dict]):
+    """Write parse results for the next run."""
+    try:
+        cache_file.write_text(json.dumps({'parser': os.stat(__file__).st_mtime_ns, 'entries': entries}))
+    except OSError as e:
+        print(f"Warning: could not write parse cache {cache_file}: {e}")
+
+def _cached_result(plugin_file: Path, entry: dict, plugin_dir: Optional[str],
+                   command_prefix: Optional[str]) -> Tuple[PluginParser, bool, str, str]:
+    """Rebuild what _process_one returns from a cache entry, without parsing the source."""
+    parser_instance = PluginParser(plugin_file, plugin_dir=plugin_dir, command_prefix=command_prefix)
+    # Restore the attributes as parsed, the constructor would strip the description again
+    for fields in entry['options']:
+        opt = PluginOption()
+        vars(opt).update(fields)
+        parser_instance.options.append(opt)
+    command_def = parser_instance.generate_icinga_command() if entry['parsed'] else ''
+    return parser_instance, entry['parsed'], command_def, entry['output']
+
+def find_plugin_files(plugins_dir: Path) -> Tuple[List[Path], List[Path]]:
+    """Collect C and Perl check sources in one walk, skipping test directories."""
+    c_files = []
+    pl_files = []
+    for dirpath, dirnames, filenames in os.walk(plugins_dir):
+        # Prune test directories and VCS metadata instead of filtering their files afterwards
+        dirnames[:] = [d for d in dirnames if d not in ('t', 'tests', '.git')]
+        for name in filenames:
+            if name.startswith('check_'):
+                if name.endswith('.c'):
+                    c_files.append(Path(dirpath, name))
+                elif name.endswith('.pl'):
+                    pl_files.append(Path(dirpath, name))
+    return c_files, pl_files
 
 def main():
     parser = argparse.ArgumentParser(
@@ -327,6 +473,12 @@ Examples:
         help='Enable progress tracking (creates parseprogress.txt in script directory)'
     )
     
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Parse every plugin again instead of reusing results for unchanged files (.parse_cache.json in script directory)'
+    )
+    
     parser.add_argument(
         '--plugin-path',
         type=str,
@@ -351,6 +503,9 @@ Examples:
         progress_file = script_dir / 'parseprogress.txt'
         print(f"Progress tracking enabled: {progress_file}")
     
+    cache_file = Path(__file__).parent / '.parse_cache.json'
+    cache = {} if args.no_cache else load_parse_cache(cache_file)
+    
     # Validate plugins directory
     if not plugins_dir.exists():
         print(f"Error: Plugins directory does not exist: {plugins_dir}")
@@ -361,12 +516,7 @@ Examples:
         sys.exit(1)
     
     # Find all check files (C and Perl)
-    c_files = list(plugins_dir.rglob('check_*.c'))
-    pl_files = list(plugins_dir.rglob('check_*.pl'))
-    
-    # Exclude test files
-    c_files = [f for f in c_files if '/t/' not in str(f) and '/tests/' not in str(f)]
-    pl_files = [f for f in pl_files if '/t/' not in str(f) and '/tests/' not in str(f)]
+    c_files, pl_files = find_plugin_files(plugins_dir)
     
     all_files = sorted(c_files + pl_files, key=lambda x: x.name)
     
@@ -380,51 +530,84 @@ Examples:
         print(f"Command prefix: {args.command_prefix}")
     print(f"Found {len(c_files)} C plugin files and {len(pl_files)} Perl plugin files")
     
-    all_commands = []
-    all_commands.append('# Nagios Plugins 2.4.12 - Icinga2 CheckCommand Definitions')
-    all_commands.append('# Auto-generated by parse_nagios_plugins.py')
-    all_commands.append(f'# Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
-    all_commands.append(f'# Source: {plugins_dir}')
-    all_commands.append('')
+    header = [
+        '# Nagios Plugins 2.4.12 - Icinga2 CheckCommand Definitions',
+        '# Auto-generated by parse_nagios_plugins.py',
+        f'# Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}',
+        f'# Source: {plugins_dir}',
+        ''
+    ]
     
-    processed = 0
-    seen_commands = {}  # Track command names to avoid duplicates
-    
-    for plugin_file in all_files:
-        print(f"\nParsing {plugin_file.name}...")
-        update_progress(plugin_file.name, 'in-progress', progress_file=progress_file)
+    # Write command definitions as they are generated instead of collecting them all
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with output_file.open('w', buffering=1 << 16) as out:
+        out.write('\n'.join(header))
         
-        parser_instance = PluginParser(plugin_file, plugin_dir=args.plugin_path, command_prefix=args.command_prefix)
-        if parser_instance.parse():
-            print(f"  Found {len(parser_instance.options)} options")
-            for opt in parser_instance.options:
-                print(f"    {opt}")
-            
-            # Generate the command name to check for duplicates
-            command_name = f"{args.command_prefix}_{parser_instance.plugin_name}" if args.command_prefix else parser_instance.plugin_name
-            
-            # Check if we already have this command
-            if command_name in seen_commands:
-                prev_file = seen_commands[command_name]
-                print(f"  ⚠ Skipping duplicate: {command_name} already defined by {prev_file.name}")
-                print(f"    Preferring {prev_file.suffix} over {plugin_file.suffix}")
-                update_progress(plugin_file.name, 'skipped', f'Duplicate of {prev_file.name}', progress_file=progress_file)
-                continue
-            
-            # Track this command
-            seen_commands[command_name] = plugin_file
-            
-            command_def = parser_instance.generate_icinga_command()
-            all_commands.append(command_def)
-            
-            update_progress(plugin_file.name, 'completed', f'{len(parser_instance.options)} options', progress_file=progress_file)
-            processed += 1
-        else:
-            update_progress(plugin_file.name, 'error', 'Failed to parse', progress_file=progress_file)
+        processed = 0
+        seen_commands = {}  # Track command names to avoid duplicates
+        
+        # Unchanged files are taken from the cache, the rest are parsed in worker
+        # processes. Results come back in file order so reporting, duplicate
+        # detection and progress tracking stay in the main process
+        keys = {plugin_file: _cache_key(plugin_file) for plugin_file in all_files}
+        new_cache = {}
+        jobs = [(plugin_file, args.plugin_path, args.command_prefix)
+                for plugin_file in all_files if keys[plugin_file] not in cache]
+        with contextlib.ExitStack() as stack:
+            # A fully cached run doesn't need any worker processes
+            parse_results = iter(())
+            if jobs:
+                pool = stack.enter_context(multiprocessing.Pool(os.cpu_count()))
+                parse_results = pool.imap(_process_one, jobs, chunksize=8)
+            for plugin_file in all_files:
+                key = keys[plugin_file]
+                entry = cache.get(key)
+                if entry is None:
+                    parser_instance, parsed, command_def, parse_output = next(parse_results)
+                    entry = {'parsed': parsed, 'options': [vars(opt) for opt in parser_instance.options],
+                             'output': parse_output}
+                else:
+                    parser_instance, parsed, command_def, parse_output = _cached_result(
+                        plugin_file, entry, args.plugin_path, args.command_prefix)
+                if key is not None:
+                    new_cache[key] = entry
+                
+                print(f"\nParsing {plugin_file.name}...")
+                update_progress(plugin_file.name, 'in-progress', progress_file=progress_file)
+                print(parse_output, end='')
+                
+                if parsed:
+                    print(f"  Found {len(parser_instance.options)} options")
+                    for opt in parser_instance.options:
+                        print(f"    {opt}")
+                    
+                    # Generate the command name to check for duplicates
+                    command_name = f"{args.command_prefix}_{parser_instance.plugin_name}" if args.command_prefix else parser_instance.plugin_name
+                    
+                    # Check if we already have this command
+                    if command_name in seen_commands:
+                        prev_file = seen_commands[command_name]
+                        print(f"  ⚠ Skipping duplicate: {command_name} already defined by {prev_file.name}")
+                        print(f"    Preferring {prev_file.suffix} over {plugin_file.suffix}")
+                        update_progress(plugin_file.name, 'skipped', f'Duplicate of {prev_file.name}', progress_file=progress_file)
+                        continue
+                    
+                    # Track this command
+                    seen_commands[command_name] = plugin_file
+                    
+                    out.write('\n')
+                    out.write(command_def)
+                    
+                    update_progress(plugin_file.name, 'completed', f'{len(parser_instance.options)} options', progress_file=progress_file)
+                    processed += 1
+                else:
+                    update_progress(plugin_file.name, 'error', 'Failed to parse', progress_file=progress_file)
     
-    # Write output
-    output_file.parent.mkdir(parents=True, exist_ok=True)
-    output_file.write_text('\n'.join(all_commands))
+    if progress_file:
+        compact_progress(progress_file)
+    
+    if not args.no_cache:
+        save_parse_cache(cache_file, new_cache)
     
     print(f"\n✓ Successfully parsed {processed}/{len(all_files)} plugins")
     print(f"✓ Generated: {output_file}")
@@ -13,9 +13,28 @@ an output file which contains the contents of both sources.
 
 import sys
 import argparse
+import itertools
 import re
 from collections import defaultdict
-from typing import Dict, List, Tuple, Optional, Set
+from typing import Dict, Iterable, Tuple, Optional, Set
+
+# The module header and every policy rule the merger understands, one alternative each:
+#   module resnet-nrpe 1.45;
+#   type rpm_exec_t;
+#   class file rename;  /  class file { rename execute setattr read };
+#   allow nagios_services_plugin_t dhcpd_state_t:file read;  /  ... :file { read getattr };
+# The last group that took part in the match names the kind of line.
+_RE_POLICY_RULE = re.compile(
+    r'^\s*(?:'
+    r'module\s+(?P<module>[\w\-_]+)\s+(?P<version>[\d\.]+);'
+    r'|type\s+(?P<type>\w+);?'
+    r'|class\s+(?P<class>\w+)\s+(?:(?P<class_perm>\w+)|\{\s*(?P<class_perms>[\s\w]+)\s*\});'
+    r'|allow\s+(?P<allow>\w+)\s+(?P<obj>\w+):(?P<cls>\w+)\s+(?:(?P<perm>\w+)|\{\s*(?P<perms>[\s\w]+)\s*\});'
+    r')\s*$'
+)
+
+# Every line _RE_POLICY_RULE can match starts with one of these once leading whitespace is gone
+_RULE_KEYWORDS = ('module', 'type', 'class', 'allow')
 
 
 class SELinuxPolicyMerger:
@@ -24,63 +43,40 @@ class SELinuxPolicyMerger:
     def __init__(self):
         self.types: Set[str] = set()
         self.classes: Dict[str, Set[str]] = defaultdict(set)
-        self.allows: Dict[str, Dict[str, Dict[str, Set[str]]]] = defaultdict(
-            lambda: defaultdict(lambda: defaultdict(set))
-        )
-    
-    def parse_module_header(self, lines: List[str]) -> Optional[Tuple[str, str]]:
-        """Extract module name and version from policy header"""
-        if not lines:
-            return None
-        
-        # Search for module declaration in the file (usually near the top)
-        for line in lines[:50]:  # Check first 50 lines
-            line = line.strip()
-            # module resnet-nrpe 1.45;
-            match = re.match(r'^module\s+([\w\-_]+)\s+([\d\.]+);$', line)
-            if match:
-                return match.group(1), match.group(2)
-        return None
-    
-    def parse_policy(self, lines: List[str]):
-        """Parse SELinux policy lines and add to internal data structures"""
-        for line in lines:
-            line = line.strip()
-            
-            # type rpm_exec_t;
-            match = re.match(r'^\s*type\s+(\w+);?$', line)
-            if match:
-                self.types.add(match.group(1))
-                continue
-            
-            # class file rename;
-            match = re.match(r'^\s*class\s+(\w+)\s+(\w+);$', line)
-            if match:
-                self.classes[match.group(1)].add(match.group(2))
-                continue
-            
-            # class file { rename execute setattr read };
-            match = re.match(r'^\s*class\s+(\w+)\s+\{\s*([\s\w]+)\s*\};$', line)
-            if match:
-                class_name = match.group(1)
-                perms = match.group(2).split()
-                self.classes[class_name].update(perms)
+        # Permissions per (source type, target type, class)
+        self.allows: Dict[Tuple[str, str, str], Set[str]] = defaultdict(set)
+    
+    def parse_policy(self, lines: Iterable[str]) -> Optional[Tuple[str, str]]:
+        """Parse SELinux policy lines, returning the module name and version if declared"""
+        header = None
+        match_rule = _RE_POLICY_RULE.match
+        for line_number, line in enumerate(lines):
+            # Blank lines, comments and braces can't match, skip them without the regex
+            line = line.lstrip()
+            if not line.startswith(_RULE_KEYWORDS):
                 continue
             
-            # allow nagios_services_plugin_t dhcpd_state_t:file read;
-            match = re.match(r'^\s*allow\s+(\w+)\s+(\w+):(\w+)\s+(\w+);$', line)
-            if match:
-                allow, obj, cls, perm = match.groups()
-                self.allows[allow][obj][cls].add(perm)
+            match = match_rule(line)
+            if not match:
                 continue
             
-            # allow nagios_services_plugin_t dhcpd_state_t:file { read getattr };
-            match = re.match(r'^\s*allow\s+(\w+)\s+(\w+):(\w+)\s+\{\s*([\s\w]+)\s*\};$', line)
-            if match:
-                allow, obj, cls, perms_str = match.groups()
-                perms = perms_str.split()
-                self.allows[allow][obj][cls].update(perms)
-                continue
+            kind = match.lastgroup
+            if kind == 'version':
+                # The module declaration is usually near the top, only the first 50 lines count
+                if header is None and line_number < 50:
+                    header = match.group('module', 'version')
+            elif kind == 'type':
+                self.types.add(match.group('type'))
+            elif kind == 'class_perm':
+                self.classes[match.group('class')].add(match.group('class_perm'))
+            elif kind == 'class_perms':
+                self.classes[match.group('class')].update(match.group('class_perms').split())
+            elif kind == 'perm':
+                self.allows[match.group('allow', 'obj', 'cls')].add(match.group('perm'))
+            else:
+                self.allows[match.group('allow', 'obj', 'cls')].update(match.group('perms').split())
+        
+        return header
     
     def increment_version(self, version: str) -> str:
         """Increment the last component of a version number"""
@@ -110,17 +106,25 @@ class SELinuxPolicyMerger:
         
         output.append("}\n")
         
-        # Allow rules
-        for allow in sorted(self.allows.keys()):
+        # Allow rules, one sort over the (allow, obj, cls) keys grouped by allow
+        rules = sorted(self.allows.items())
+        for allow, group in itertools.groupby(rules, key=lambda rule: rule[0][0]):
             output.append(f"\n#============= {allow} ==============\n")
-            for obj in sorted(self.allows[allow].keys()):
-                for cls in sorted(self.allows[allow][obj].keys()):
-                    perms = sorted(self.allows[allow][obj][cls])
-                    output.append(f"allow {allow} {obj}:{cls} {{ {' '.join(perms)} }};\n")
+            for (_, obj, cls), perms in group:
+                output.append(f"allow {allow} {obj}:{cls} {{ {' '.join(sorted(perms))} }};\n")
         
         return ''.join(output)
 
 
+def parse_source(merger: SELinuxPolicyMerger, source: Iterable[str]) -> Optional[Tuple[str, str]]:
+    """Stream a policy source into the merger, ignoring sources with less than two lines"""
+    lines = iter(source)
+    first = list(itertools.islice(lines, 2))
+    if len(first) > 1:
+        return merger.parse_policy(itertools.chain(first, lines))
+    return None
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Merge SELinux policy files',
@@ -174,24 +178,17 @@ EXAMPLES:
     
     # Read from STDIN if available
     if not sys.stdin.isatty():
-        stdin_lines = [line.rstrip('\n') for line in sys.stdin]
-        if len(stdin_lines) > 1:
-            header = merger.parse_module_header(stdin_lines)
-            if header:
-                stdin_name, stdin_version = header
-            merger.parse_policy(stdin_lines)
+        header = parse_source(merger, sys.stdin)
+        if header:
+            stdin_name, stdin_version = header
     
     # Read from input file if specified
     if args.input:
         try:
             with open(args.input, 'r') as f:
-                file_lines = [line.rstrip('\n') for line in f]
-            
-            if len(file_lines) > 1:
-                header = merger.parse_module_header(file_lines)
-                if header:
-                    file_name, file_version = header
-                merger.parse_policy(file_lines)
+                header = parse_source(merger, f)
+            if header:
+                file_name, file_version = header
         except IOError as e:
             print(f"Can't open {args.input} for reading: {e}", file=sys.stderr)
             sys.exit(1)